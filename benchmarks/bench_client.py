@@ -0,0 +1,163 @@
+"""
+Client benchmark: ScheduleAPIClient against the local fake frsview API.
+
+Measures catalogue crawls (``get_all_schedules``) and detail fetches
+(``fetch_schedule_details``) at several concurrency levels, reporting
+throughput and per-request latency percentiles. Caches are bypassed unless
+``--cached`` is given, so every call reaches the server.
+
+Usage:
+    python benchmarks/bench_client.py [--schedules 200] [--lessons 300]
+        [--latency-ms 20 80] [--error-rate 0.0] [--concurrency 1 5 20]
+        [--fixtures DIR] [--url http://127.0.0.1:8800/api]
+
+With ``--url`` an already running server is used instead of an in-process one.
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from fake_frsview import FakeFrsview  # noqa: E402
+
+from api.client import ScheduleAPIClient  # noqa: E402
+from api.exceptions import APIError  # noqa: E402
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def report(name: str, elapsed: float, latencies: list[float], failed: int) -> None:
+    latencies_ms = [latency * 1000 for latency in latencies]
+    print(  # noqa: T201
+        f"{name:<32} {len(latencies) / elapsed:8.1f} req/s "
+        f"p50 {percentile(latencies_ms, 0.5):7.1f} ms "
+        f"p95 {percentile(latencies_ms, 0.95):7.1f} ms "
+        f"p99 {percentile(latencies_ms, 0.99):7.1f} ms "
+        f"mean {statistics.fmean(latencies_ms):7.1f} ms "
+        f"failed {failed}"
+    )
+
+
+async def timed_calls(
+    calls: Iterable[Callable[[], Awaitable[object]]],
+    concurrency: int,
+) -> tuple[float, list[float], int]:
+    """Run calls with bounded concurrency. Returns wall time, latencies and failures."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    failed = 0
+
+    async def run(call: Callable[[], Awaitable[object]]) -> None:
+        nonlocal failed
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call()
+            except APIError:
+                failed += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(call) for call in calls))
+    return time.perf_counter() - started, latencies, failed
+
+
+async def bench_crawl(
+    client: ScheduleAPIClient,
+    concurrency: int,
+    repeat: int,
+    cached: bool,
+) -> None:
+    """Whole catalogue crawls, latency per crawl."""
+    elapsed, latencies, failed = await timed_calls(
+        (
+            lambda: client.get_all_schedules(concurrency=concurrency, use_cache=cached)
+            for _ in range(repeat)
+        ),
+        concurrency=1,
+    )
+    report(f"crawl c={concurrency}", elapsed, latencies, failed)
+
+
+async def bench_details(
+    client: ScheduleAPIClient,
+    schedule_ids: list[int],
+    concurrency: int,
+    cached: bool,
+) -> None:
+    elapsed, latencies, failed = await timed_calls(
+        (
+            lambda schedule_id=schedule_id: client.fetch_schedule_details(
+                schedule_id, use_cache=cached
+            )
+            for schedule_id in schedule_ids
+        ),
+        concurrency,
+    )
+    report(f"details c={concurrency}", elapsed, latencies, failed)
+
+
+async def run(args: argparse.Namespace) -> None:
+    server = None
+    url = args.url
+    if url is None:
+        low, high = args.latency_ms
+        server = FakeFrsview(
+            schedules=args.schedules,
+            lessons=args.lessons,
+            fixtures=args.fixtures,
+            latency=(low / 1000, high / 1000),
+            error_rate=args.error_rate,
+            seed=0,
+        )
+        await server.start()
+        url = server.url
+
+    try:
+        async with ScheduleAPIClient(base_url=url, retry_delay=0.05) as client:
+            # Warm up connections before measuring
+            schedules = await client.get_all_schedules(use_cache=False)
+            schedule_ids = [schedule.id for schedule in schedules]
+            print(f"{len(schedule_ids)} schedules at {url}")  # noqa: T201
+            for concurrency in args.concurrency:
+                await bench_crawl(client, concurrency, args.repeat, args.cached)
+            for concurrency in args.concurrency:
+                await bench_details(client, schedule_ids, concurrency, args.cached)
+            stats = client.pool_stats()
+            print(f"pool: {stats.open} open, {stats.idle} idle")  # noqa: T201
+    finally:
+        if server is not None:
+            print(f"server requests: {server.requests}")  # noqa: T201
+            await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--schedules", type=int, default=200)
+    parser.add_argument("--lessons", type=int, default=300)
+    parser.add_argument("--fixtures", type=Path)
+    parser.add_argument("--latency-ms", type=float, nargs=2, default=(20.0, 80.0))
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--repeat", type=int, default=3, help="Catalogue crawls per level")
+    parser.add_argument("--cached", action="store_true", help="Allow client cache hits")
+    parser.add_argument("--url")
+    args = parser.parse_args()
+
+    # Retries and errors are part of the results, not worth a log line each
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
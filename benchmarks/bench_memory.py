@@ -0,0 +1,68 @@
+"""
+Memory benchmark: list of ScheduleLesson models vs compact LessonTable.
+
+Usage:
+    python benchmarks/bench_memory.py [--payload findById.json ...] [--lessons 20000]
+
+Without ``--payload`` a synthetic schedule with ``--lessons`` lessons is used.
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from bench_parse import synthetic_payload  # noqa: E402
+
+from api.compact import CompactSchedule  # noqa: E402
+from api.schemas.responses import XlsxScheduleDetail  # noqa: E402
+
+
+def measure(build: Callable[[], Any]) -> tuple[Any, int]:
+    """Return built object and bytes retained by it."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def bench(name: str, body: bytes) -> None:
+    models, models_size = measure(lambda: XlsxScheduleDetail.model_validate_json(body))
+    compact, compact_size = measure(
+        lambda: CompactSchedule.from_detail(XlsxScheduleDetail.model_validate_json(body))
+    )
+    assert compact.to_detail() == models  # noqa: S101
+
+    lessons = len(models.schedule_lesson_dto_list)
+    print(  # noqa: T201
+        f"{name}: {lessons} lessons, "
+        f"pydantic {models_size / 1024 / 1024:.1f} MiB, "
+        f"compact {compact_size / 1024 / 1024:.1f} MiB "
+        f"({len(compact.lessons.pool)} distinct strings), "
+        f"ratio x{models_size / compact_size:.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--payload", type=Path, nargs="*", default=[])
+    parser.add_argument("--lessons", type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.payload:
+        for path in args.payload:
+            bench(path.name, path.read_bytes())
+    else:
+        bench(f"synthetic[{args.lessons}]", synthetic_payload(args.lessons))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Micro-benchmark: two-pass vs single-pass parsing of findById payloads.
+
+Compares ``json.loads`` + ``model_validate`` (the old dict path) with
+``model_validate_json`` on the raw body (the typed ``get_model`` path).
+
+Usage:
+    python benchmarks/bench_parse.py [--payload findById.json ...] [--lessons 5000]
+
+Without ``--payload`` a synthetic schedule with ``--lessons`` lessons is used.
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from fake_frsview import synthetic_detail  # noqa: E402
+
+from api.schemas.responses import XlsxScheduleDetail  # noqa: E402
+
+
+def synthetic_payload(lessons: int) -> bytes:
+    """Build a findById body with ``lessons`` lessons."""
+    return json.dumps(synthetic_detail(1, lessons), ensure_ascii=False).encode()
+
+
+def two_pass(body: bytes) -> XlsxScheduleDetail:
+    return XlsxScheduleDetail.model_validate(json.loads(body))
+
+
+def single_pass(body: bytes) -> XlsxScheduleDetail:
+    return XlsxScheduleDetail.model_validate_json(body)
+
+
+def bench(name: str, body: bytes, repeat: int) -> None:
+    number = max(1, repeat)
+    two = min(timeit.repeat(lambda: two_pass(body), number=number, repeat=5)) / number
+    one = min(timeit.repeat(lambda: single_pass(body), number=number, repeat=5)) / number
+    print(  # noqa: T201
+        f"{name}: {len(body) / 1024:.0f} KiB, "
+        f"json.loads+model_validate {two * 1000:.2f} ms, "
+        f"model_validate_json {one * 1000:.2f} ms, "
+        f"speedup x{two / one:.2f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--payload", type=Path, nargs="*", default=[])
+    parser.add_argument("--lessons", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.payload:
+        for path in args.payload:
+            bench(path.name, path.read_bytes(), args.repeat)
+    else:
+        bench(f"synthetic[{args.lessons}]", synthetic_payload(args.lessons), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
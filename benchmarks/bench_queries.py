@@ -0,0 +1,175 @@
+"""
+Lesson lookup benchmark against a local Postgres.
+
+Runs the day, week, next-week and next-lesson queries of ``LessonRepository``
+for random subgroups and dates of a database filled by ``seed_db.py``,
+reporting latency percentiles and the ``EXPLAIN (ANALYZE, BUFFERS)`` plan of
+one sample of each query.
+
+Usage:
+    python benchmarks/bench_queries.py [--iterations 500] [--concurrency 1 8]
+        [--no-explain]
+
+Connection settings come from the DB_* environment variables.
+"""
+
+import argparse
+import asyncio
+import datetime
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.config import DatabaseSettings  # noqa: E402
+from core.database import create_engine  # noqa: E402
+from models.lesson import Lesson  # noqa: E402
+from services.lessons import (  # noqa: E402
+    LessonCursor,
+    adjacent_week_statement,
+    after_statement,
+    range_statement,
+    week_start,
+)
+
+Sample = tuple[int, datetime.date, datetime.time]
+
+
+def day_query(subgroup_id: int, date: datetime.date, time_: datetime.time) -> Select:  # noqa: ARG001
+    return range_statement(subgroup_id, date, date)
+
+
+def week_query(subgroup_id: int, date: datetime.date, time_: datetime.time) -> Select:  # noqa: ARG001
+    monday = week_start(date)
+    return range_statement(subgroup_id, monday, monday + datetime.timedelta(days=6))
+
+
+def next_week_query(subgroup_id: int, date: datetime.date, time_: datetime.time) -> Select:  # noqa: ARG001
+    return adjacent_week_statement(subgroup_id, date, forward=True)
+
+
+def next_lesson_query(subgroup_id: int, date: datetime.date, time_: datetime.time) -> Select:
+    return after_statement(subgroup_id, LessonCursor(date, time_), limit=1)
+
+
+QUERIES: dict[str, Callable[[int, datetime.date, datetime.time], Select]] = {
+    "day": day_query,
+    "week": week_query,
+    "next week": next_week_query,
+    "next lesson": next_lesson_query,
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def report(name: str, elapsed: float, latencies: list[float]) -> None:
+    latencies_ms = [latency * 1000 for latency in latencies]
+    print(  # noqa: T201
+        f"{name:<24} {len(latencies) / elapsed:8.1f} q/s "
+        f"p50 {percentile(latencies_ms, 0.5):7.2f} ms "
+        f"p99 {percentile(latencies_ms, 0.99):7.2f} ms "
+        f"mean {statistics.fmean(latencies_ms):7.2f} ms"
+    )
+
+
+async def samples(engine: AsyncEngine, count: int, seed: int) -> list[Sample]:
+    """Random subgroups and moments within the seeded date range."""
+    async with engine.connect() as connection:
+        bounds = await connection.execute(
+            select(
+                func.min(Lesson.subgroup_id),
+                func.max(Lesson.subgroup_id),
+                func.min(Lesson.date),
+                func.max(Lesson.date),
+            )
+        )
+        min_subgroup, max_subgroup, first_day, last_day = bounds.one()
+    if min_subgroup is None:
+        raise SystemExit("No lessons found, run benchmarks/seed_db.py first")
+
+    rng = random.Random(seed)  # noqa: S311
+    days = (last_day - first_day).days
+    return [
+        (
+            rng.randint(min_subgroup, max_subgroup),
+            first_day + datetime.timedelta(days=rng.randint(0, days)),
+            datetime.time(rng.randint(8, 20), rng.choice((0, 30))),
+        )
+        for _ in range(count)
+    ]
+
+
+async def bench(
+    engine: AsyncEngine,
+    query: Callable[[int, datetime.date, datetime.time], Select],
+    sample_list: list[Sample],
+    concurrency: int,
+) -> tuple[float, list[float]]:
+    """Run ``query`` for every sample. Returns wall time and latencies."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def run(sample: Sample) -> None:
+        async with semaphore, engine.connect() as connection:
+            started = time.perf_counter()
+            result = await connection.execute(query(*sample))
+            result.all()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(sample) for sample in sample_list))
+    return time.perf_counter() - started, latencies
+
+
+async def explain(engine: AsyncEngine, name: str, statement: Select) -> None:
+    async with engine.connect() as connection:
+        compiled = statement.compile(dialect=connection.dialect)
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS) {compiled}", compiled.params
+        )
+        print(f"\n{name}:")  # noqa: T201
+        for (line,) in result:
+            print(f"  {line}")  # noqa: T201
+
+
+async def run(args: argparse.Namespace) -> None:
+    engine = create_engine(DatabaseSettings(), pool_size=max(args.concurrency))
+    try:
+        sample_list = await samples(engine, args.iterations, args.seed)
+        # Warm up connections and the buffer cache before measuring
+        for query in QUERIES.values():
+            await bench(engine, query, sample_list[:20], max(args.concurrency))
+
+        for name, query in QUERIES.items():
+            for concurrency in args.concurrency:
+                elapsed, latencies = await bench(engine, query, sample_list, concurrency)
+                report(f"{name} c={concurrency}", elapsed, latencies)
+
+        if args.explain:
+            for name, query in QUERIES.items():
+                await explain(engine, name, query(*sample_list[0]))
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=500, help="Queries per measurement")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-explain", dest="explain", action="store_false")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Local stand-in for the frsview schedule API.
+
+Serves ``xlsxSchedule/findAll/{page}`` and ``xlsxSchedule/findById`` from
+recorded fixtures or from synthetic schedules, with optional latency, error
+injection and a cap on page size to force paging. Filters are ignored.
+
+Usage:
+    python benchmarks/fake_frsview.py serve [--schedules 200] [--lessons 300]
+        [--latency-ms 20 80] [--error-rate 0.05] [--fixtures DIR] [--port 8800]
+    python benchmarks/fake_frsview.py record --out DIR [--limit 50]
+        [--url https://frsview.szgmu.ru/api]
+
+Recorded fixtures are ``summaries.json`` with the catalogue and
+``details/<id>.json`` with raw ``findById`` bodies.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from api.client import ScheduleAPIClient  # noqa: E402
+from api.endpoints import ScheduleEndpoint  # noqa: E402
+
+DAYS = ["пн", "вт", "ср", "чт", "пт", "сб"]
+PAIR_TIMES = ["09:00-10:30", "10:45-12:15", "13:00-14:30", "14:45-16:15"]
+SPECIALITIES = [
+    "31.05.01 Лечебное дело",
+    "31.05.02 Педиатрия",
+    "32.05.01 Медико-профилактическое дело",
+    "31.05.03 Стоматология",
+]
+LESSON_TYPES = ["лекционного", "семинарского"]
+
+
+def synthetic_header(schedule_id: int) -> dict[str, Any]:
+    return {
+        "id": schedule_id,
+        "lessonTypeName": LESSON_TYPES[schedule_id % 2],
+        "semesterType": "весенний",
+        "academicYear": "2025/2026",
+        "courseNumber": str(1 + schedule_id // 2 % 6),
+        "speciality": SPECIALITIES[schedule_id // 12 % len(SPECIALITIES)],
+        "groupStream": "АБВГ"[schedule_id // 48 % 4],
+    }
+
+
+def synthetic_summary(schedule_id: int) -> dict[str, Any]:
+    """Catalogue entry of a synthetic schedule."""
+    return {
+        "id": schedule_id,
+        "formType": 1,
+        "fileName": f"schedule_{schedule_id}.xlsx",
+        "xlsxHeaderDto": [synthetic_header(schedule_id)],
+        "scheduleStatus": {"id": 1, "name": "Опубликовано"},
+        "isUploadedFromXlsx": True,
+    }
+
+
+def synthetic_detail(schedule_id: int, lessons: int) -> dict[str, Any]:
+    """``findById`` body of a synthetic schedule with ``lessons`` lessons."""
+    header = synthetic_header(schedule_id)
+    lesson_list = [
+        {
+            "id": schedule_id * 100_000 + i,
+            "subjectName": f"Дисциплина {i % 40}",
+            "pairTime": PAIR_TIMES[i % len(PAIR_TIMES)],
+            "departmentName": f"Кафедра {i % 25}",
+            "dayName": DAYS[i % len(DAYS)],
+            "weekNumber": "1,3,5,7,9,11,13,15,17",
+            "groupTypeName": None,
+            "lectorName": f"Преподаватель {i % 120}",
+            "auditoryNumber": str(100 + i % 50),
+            "locationAddress": "Пискарёвский пр., 47",
+            "studyGroup": f"{101 + i % 30}",
+            "subgroup": "а" if i % 2 else "б",
+            "groupStream": header["groupStream"],
+            "scheduleId": schedule_id,
+            "fileName": f"schedule_{schedule_id}.xlsx",
+            "lessonType": header["lessonTypeName"],
+            "errorList": None,
+            "speciality": header["speciality"],
+            "semester": header["semesterType"],
+            "academicYear": header["academicYear"],
+            "courseNumber": header["courseNumber"],
+        }
+        for i in range(lessons)
+    ]
+    return {
+        "id": schedule_id,
+        "xlsxHeaderDto": [header],
+        "scheduleLessonDtoList": lesson_list,
+        "subjectList": sorted({lesson["subjectName"] for lesson in lesson_list}),
+        "formType": 1,
+        "statusId": 1,
+        "fileName": f"schedule_{schedule_id}.xlsx",
+        "isUploadedFromExcel": True,
+        "updateTime": "2026-02-01T10:00:00",
+    }
+
+
+class FakeFrsview:
+    """
+    In-process fake of the schedule API.
+
+    Without ``fixtures`` it serves ``schedules`` synthetic schedules with
+    ``lessons`` lessons each. Every response is delayed by a random time in
+    ``latency`` seconds, and fails with ``error_status`` at ``error_rate``.
+    ``max_page_size`` caps the ``size`` asked by clients.
+    """
+
+    def __init__(
+        self,
+        schedules: int = 200,
+        lessons: int = 300,
+        fixtures: Path | None = None,
+        latency: tuple[float, float] = (0.0, 0.0),
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        max_page_size: int = 100,
+        seed: int | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.max_page_size = max_page_size
+        self.host = host
+        self.port = port
+        self.requests = {"findAll": 0, "findById": 0, "errors": 0}
+        self._random = random.Random(seed)  # noqa: S311
+        self._runner: web.AppRunner | None = None
+
+        if fixtures is not None:
+            self.summaries = json.loads((fixtures / "summaries.json").read_bytes())
+            self.details = {
+                int(path.stem): path.read_bytes() for path in (fixtures / "details").glob("*.json")
+            }
+        else:
+            self.summaries = [synthetic_summary(i) for i in range(schedules, 0, -1)]
+            self.details = {
+                i: json.dumps(synthetic_detail(i, lessons), ensure_ascii=False).encode()
+                for i in range(1, schedules + 1)
+            }
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/api"
+
+    async def _delay_or_fail(self) -> web.Response | None:
+        low, high = self.latency
+        if high > 0:
+            await asyncio.sleep(self._random.uniform(low, high))
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.requests["errors"] += 1
+            return web.Response(status=self.error_status, headers={"Retry-After": "0"})
+        return None
+
+    async def find_all(self, request: web.Request) -> web.Response:
+        self.requests["findAll"] += 1
+        if (error := await self._delay_or_fail()) is not None:
+            return error
+
+        page = int(request.match_info["page"])
+        size = min(int(request.query.get("size", 20)), self.max_page_size)
+        total = len(self.summaries)
+        content = self.summaries[page * size : (page + 1) * size]
+        total_pages = -(-total // size)
+        return web.json_response(
+            {
+                "content": content,
+                "pageable": {"pageNumber": page, "pageSize": size, "sort": {}},
+                "totalElements": total,
+                "totalPages": total_pages,
+                "size": size,
+                "number": page,
+                "first": page == 0,
+                "last": page >= total_pages - 1,
+                "numberOfElements": len(content),
+                "empty": not content,
+            }
+        )
+
+    async def find_by_id(self, request: web.Request) -> web.Response:
+        self.requests["findById"] += 1
+        if (error := await self._delay_or_fail()) is not None:
+            return error
+
+        body = self.details.get(int(request.query["xlsxScheduleId"]))
+        if body is None:
+            return web.Response(status=204)
+        return web.Response(body=body, content_type="application/json")
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/api/xlsxSchedule/findAll/{page}", self.find_all)
+        app.router.add_get("/api/xlsxSchedule/findById", self.find_by_id)
+        return app
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Port 0 picks a free one
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeFrsview":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
+
+
+async def record(url: str, out: Path, limit: int | None) -> None:
+    """Save the upstream catalogue and up to ``limit`` raw schedules as fixtures."""
+    (out / "details").mkdir(parents=True, exist_ok=True)
+    async with ScheduleAPIClient(base_url=url, enable_cache=False) as client:
+        summaries = await client.get_all_schedules()
+        (out / "summaries.json").write_text(
+            json.dumps(
+                [summary.model_dump(mode="json", by_alias=True) for summary in summaries],
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        for summary in summaries[:limit]:
+            detail = await client.get(
+                ScheduleEndpoint.find_by_id(), params={"xlsxScheduleId": summary.id}
+            )
+            (out / "details" / f"{summary.id}.json").write_text(
+                json.dumps(detail, ensure_ascii=False), encoding="utf-8"
+            )
+    print(f"Recorded {len(summaries)} summaries, {len(summaries[:limit])} details to {out}")  # noqa: T201
+
+
+async def serve(server: FakeFrsview) -> None:
+    async with server:
+        print(f"Serving fake frsview at {server.url}")  # noqa: T201
+        await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve")
+    serve_parser.add_argument("--schedules", type=int, default=200)
+    serve_parser.add_argument("--lessons", type=int, default=300)
+    serve_parser.add_argument("--fixtures", type=Path)
+    serve_parser.add_argument("--latency-ms", type=float, nargs=2, default=(0.0, 0.0))
+    serve_parser.add_argument("--error-rate", type=float, default=0.0)
+    serve_parser.add_argument("--error-status", type=int, default=503)
+    serve_parser.add_argument("--max-page-size", type=int, default=100)
+    serve_parser.add_argument("--port", type=int, default=8800)
+
+    record_parser = commands.add_parser("record")
+    record_parser.add_argument("--out", type=Path, required=True)
+    record_parser.add_argument("--limit", type=int)
+    record_parser.add_argument("--url", default="https://frsview.szgmu.ru/api")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        asyncio.run(record(args.url, args.out, args.limit))
+        return
+
+    low, high = args.latency_ms
+    server = FakeFrsview(
+        schedules=args.schedules,
+        lessons=args.lessons,
+        fixtures=args.fixtures,
+        latency=(low / 1000, high / 1000),
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        max_page_size=args.max_page_size,
+        port=args.port,
+    )
+    try:
+        asyncio.run(serve(server))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Synthetic data generator for the schedule database.
+
+Fills ``specialities``, ``groups``, ``subgroups``, ``lessons`` and ``users``
+at university scale through COPY. At ``--scale 1`` that is 12 specialities,
+6 courses of 12 groups each split in two subgroups (1728 subgroups) and
+about a million lessons over an academic year.
+
+The schema must exist (``alembic upgrade head``) and the tables must be
+empty, or pass ``--truncate`` to wipe them first.
+
+Usage:
+    python benchmarks/seed_db.py [--dsn postgresql://...] [--scale 1.0]
+        [--users 8000] [--year 2025] [--seed 0] [--truncate]
+
+Without ``--dsn`` the DB_* settings are used.
+"""
+
+import argparse
+import datetime
+import random
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import psycopg
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.config import DatabaseSettings  # noqa: E402
+from models.enums import EducationLevel, LessonType  # noqa: E402
+
+COURSES = 6
+GROUPS_PER_COURSE = 12
+SUBGROUPS = ("а", "б")
+SUBJECTS_PER_COURSE = 40
+TEACHERS = 1500
+ROOMS = 300
+ADDRESSES = (
+    "Пискарёвский пр., 47",
+    "Кирочная ул., 41",
+    "ул. Заневская, 1/82",
+    "Литейный пр., 56",
+    "ул. Сантьяго-де-Куба, 1/28",
+)
+PAIRS = (
+    (datetime.time(9, 0), datetime.time(10, 30)),
+    (datetime.time(10, 45), datetime.time(12, 15)),
+    (datetime.time(13, 0), datetime.time(14, 30)),
+    (datetime.time(14, 45), datetime.time(16, 15)),
+    (datetime.time(16, 30), datetime.time(18, 0)),
+    (datetime.time(18, 15), datetime.time(19, 45)),
+)
+LESSONS_PER_DAY = (0, 2, 3, 3, 3, 4)
+TABLES = ("lessons", "users", "subgroups", "groups", "specialities")
+
+
+def study_days(year: int) -> list[datetime.date]:
+    """Monday to Saturday of both semesters, without winter and summer breaks."""
+    semesters = (
+        (datetime.date(year, 9, 1), datetime.date(year, 12, 28)),
+        (datetime.date(year + 1, 2, 9), datetime.date(year + 1, 6, 30)),
+    )
+    days = []
+    for start, end in semesters:
+        day = start
+        while day <= end:
+            if day.weekday() < 6:
+                days.append(day)
+            day += datetime.timedelta(days=1)
+    return days
+
+
+def speciality_rows(count: int) -> Iterator[tuple]:
+    levels = list(EducationLevel)
+    for speciality_id in range(1, count + 1):
+        code = f"31.05.{speciality_id:02d}"
+        name = f"Специальность {speciality_id}"
+        level = levels[speciality_id % len(levels)]
+        yield speciality_id, code, f"{code} {name}", name, level.name
+
+
+def group_rows(specialities: int) -> Iterator[tuple]:
+    group_id = 0
+    for speciality_id in range(1, specialities + 1):
+        for course in range(1, COURSES + 1):
+            for number in range(1, GROUPS_PER_COURSE + 1):
+                group_id += 1
+                stream = "АБ"[number % 2]
+                yield group_id, speciality_id, course, stream, f"{course}{number:02d}"
+
+
+def subgroup_rows(groups: int) -> Iterator[tuple]:
+    subgroup_id = 0
+    for group_id in range(1, groups + 1):
+        for name in SUBGROUPS:
+            subgroup_id += 1
+            yield subgroup_id, group_id, name
+
+
+def lesson_rows(rng: random.Random, subgroups: int, days: list[datetime.date]) -> Iterator[tuple]:
+    for subgroup_id in range(1, subgroups + 1):
+        group_id = (subgroup_id + 1) // 2
+        # Same subjects within a speciality course
+        subject_base = (group_id - 1) // GROUPS_PER_COURSE * SUBJECTS_PER_COURSE
+        for day in days:
+            for start_time, end_time in rng.sample(PAIRS, rng.choice(LESSONS_PER_DAY)):
+                lesson_type = LessonType.LECTURE if rng.random() < 0.3 else LessonType.SEMINAR
+                yield (
+                    subgroup_id,
+                    f"Дисциплина {subject_base + rng.randrange(SUBJECTS_PER_COURSE)}",
+                    lesson_type.name,
+                    day,
+                    start_time,
+                    end_time,
+                    f"Преподаватель {rng.randrange(TEACHERS)}",
+                    rng.choice(ADDRESSES),
+                    str(100 + rng.randrange(ROOMS)),
+                )
+
+
+def user_rows(rng: random.Random, count: int, subgroups: int) -> Iterator[tuple]:
+    for index in range(count):
+        telegram_id = 100_000_000 + index * 7919
+        notification_time = datetime.time(rng.choice((6, 7, 7, 7, 8, 20, 21)), rng.choice((0, 30)))
+        yield (
+            telegram_id,
+            f"user{index}",
+            f"Студент {index}",
+            rng.randint(1, subgroups),
+            rng.random() < 0.6,
+            notification_time,
+        )
+
+
+def copy(cursor: psycopg.Cursor, table: str, columns: tuple[str, ...], rows) -> int:
+    started = time.perf_counter()
+    count = 0
+    with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row(row)
+            count += 1
+    print(f"{table}: {count} rows in {time.perf_counter() - started:.1f}s")  # noqa: T201
+    return count
+
+
+def seed(dsn: str, scale: float, users: int, year: int, seed: int, truncate: bool) -> None:
+    rng = random.Random(seed)  # noqa: S311
+    specialities = max(1, round(12 * scale))
+    groups = specialities * COURSES * GROUPS_PER_COURSE
+    subgroups = groups * len(SUBGROUPS)
+
+    with psycopg.connect(dsn) as connection, connection.cursor() as cursor:
+        if truncate:
+            cursor.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+
+        copy(
+            cursor,
+            "specialities",
+            ("id", "code", "full_name", "clean_name", "level"),
+            speciality_rows(specialities),
+        )
+        copy(
+            cursor,
+            "groups",
+            ("id", "speciality_id", "course_number", "stream", "name"),
+            group_rows(specialities),
+        )
+        copy(cursor, "subgroups", ("id", "group_id", "name"), subgroup_rows(groups))
+        copy(
+            cursor,
+            "lessons",
+            (
+                "subgroup_id",
+                "subject",
+                "lesson_type",
+                "date",
+                "start_time",
+                "end_time",
+                "teacher",
+                "address",
+                "room",
+            ),
+            lesson_rows(rng, subgroups, study_days(year)),
+        )
+        copy(
+            cursor,
+            "users",
+            (
+                "telegram_id",
+                "username",
+                "full_name",
+                "subgroup_id",
+                "is_subscribed",
+                "notification_time",
+            ),
+            user_rows(rng, users, subgroups),
+        )
+
+        # Ids were given explicitly, move sequences past them
+        for table in ("specialities", "groups", "subgroups"):
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), max(id)) FROM {table}"  # noqa: S608
+            )
+        for table in TABLES:
+            cursor.execute(f"ANALYZE {table}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dsn")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--users", type=int, default=8000)
+    parser.add_argument("--year", type=int, default=2025, help="First year of academic year")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--truncate", action="store_true", help="Wipe tables before seeding")
+    args = parser.parse_args()
+
+    dsn = args.dsn or DatabaseSettings().dsn.replace("+psycopg", "")
+    seed(dsn, args.scale, args.users, args.year, args.seed, args.truncate)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ from src.models.user import User
 from src.models.student_group import Group, Subgroup
 from src.models.speciality import Speciality
 from src.models.lesson import Lesson
+from src.models.sync_state import ScheduleSyncState
 
 from src.core.config import Settings
 
@@ -29,6 +30,11 @@ target_metadata = Base.metadata
 settings = Settings()
 
 
+def include_name(name, type_, parent_names) -> bool:
+    # Optional pg_trgm indexes exist only where the extension is available
+    return not (type_ == "index" and name is not None and name.endswith("_trgm"))
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -48,6 +54,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -59,6 +66,7 @@ def do_run_migrations(connection: Connection) -> None:
         connection=connection,
         target_metadata=target_metadata,
         compare_type=True,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
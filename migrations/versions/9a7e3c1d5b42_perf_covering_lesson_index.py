@@ -0,0 +1,40 @@
+"""perf: covering lesson index
+
+Revision ID: 9a7e3c1d5b42
+Revises: 4f1d2c8e9a31
+Create Date: 2026-02-03 11:24:09.530871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a7e3c1d5b42'
+down_revision: Union[str, Sequence[str], None] = '4f1d2c8e9a31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # uq_lesson_unique starts with (subgroup_id, date), so idx_lessons_lookup is redundant
+    op.drop_index('idx_lessons_lookup', table_name='lessons')
+    op.drop_constraint('uq_lesson_unique', 'lessons', type_='unique')
+    # create_unique_constraint builds a table of the key columns only and can't take INCLUDE
+    op.execute(
+        'ALTER TABLE lessons ADD CONSTRAINT uq_lesson_unique '
+        'UNIQUE (subgroup_id, date, start_time, subject) '
+        'INCLUDE (end_time, lesson_type, teacher, address, room)'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_lesson_unique', 'lessons', type_='unique')
+    op.create_unique_constraint(
+        'uq_lesson_unique', 'lessons', ['subgroup_id', 'date', 'start_time', 'subject']
+    )
+    op.create_index('idx_lessons_lookup', 'lessons', ['subgroup_id', 'date'], unique=False)
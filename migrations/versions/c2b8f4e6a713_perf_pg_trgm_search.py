@@ -0,0 +1,47 @@
+"""perf: pg_trgm search
+
+Revision ID: c2b8f4e6a713
+Revises: 9a7e3c1d5b42
+Create Date: 2026-02-10 16:41:52.207318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2b8f4e6a713'
+down_revision: Union[str, Sequence[str], None] = '9a7e3c1d5b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Expressions must match services.search._normalized_sql for the planner to use them
+TRIGRAM_INDEXES = {
+    'ix_groups_name_trgm': ('groups', 'name'),
+    'ix_specialities_clean_name_trgm': ('specialities', 'clean_name'),
+    'ix_lessons_teacher_trgm': ('lessons', 'teacher'),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SEARCH_BACKEND=pg_trgm is optional, skip where the contrib module is missing
+    available = op.get_bind().scalar(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    )
+    if not available:
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, (table, column) in TRIGRAM_INDEXES.items():
+        op.execute(
+            f"CREATE INDEX {name} ON {table} "
+            f"USING gin (translate(lower({column}), 'ё', 'е') gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TRIGRAM_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
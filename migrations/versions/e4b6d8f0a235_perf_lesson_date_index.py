@@ -0,0 +1,35 @@
+"""perf: lesson date index
+
+Revision ID: e4b6d8f0a235
+Revises: d7f3a9b1c024
+Create Date: 2026-02-20 10:12:47.218304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b6d8f0a235'
+down_revision: Union[str, Sequence[str], None] = 'd7f3a9b1c024'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # uq_lesson_unique leads with subgroup_id, a day of every subgroup needs its own index
+    op.create_index(
+        'idx_lessons_date',
+        'lessons',
+        ['date'],
+        unique=False,
+        postgresql_include=['start_time', 'end_time', 'subject', 'teacher', 'address', 'room'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_lessons_date', table_name='lessons')
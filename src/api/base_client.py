@@ -1,18 +1,66 @@
 import asyncio
+import hashlib
+import json
 import logging
-from typing import Any
+import re
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
 from urllib.parse import urljoin
 
 import aiohttp
-from aiohttp import ClientError, ClientResponseError, ClientTimeout
+from aiohttp import ClientError, ClientResponseError
+from pydantic import BaseModel, ValidationError
 
-from api.exceptions import APIError, APINetworkError, APITimeoutError
+from api.cache import CacheKey, ResponseCache
+from api.exceptions import (
+    APICircuitOpenError,
+    APIError,
+    APINetworkError,
+    APITimeoutError,
+    APIValidationError,
+)
+from api.resilience import CircuitBreaker, CircuitState, RetryPolicy, parse_retry_after
+from api.transport import PoolStats, TransportOptions
+from core import metrics
+from core.rate_limit import TokenBucket
+from core.shared_cache import SharedCache
 
 logger = logging.getLogger(__name__)
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Path segments that are ids or page numbers, kept out of metric labels
+NUMERIC_SEGMENT_RE = re.compile(r"/\d+(?=/|$)")
+
+API_REQUEST_SECONDS = metrics.histogram(
+    "api_request_duration_seconds", "Upstream API request attempts", ("endpoint", "status")
+)
+API_ERRORS = metrics.counter(
+    "api_errors", "Failed upstream API attempts by exception type", ("endpoint", "error")
+)
+API_RETRIES = metrics.counter("api_retries", "Retried upstream API attempts", ("endpoint",))
+API_POOL_CONNECTIONS = metrics.gauge(
+    "api_pool_connections", "Upstream connection pool usage", ("state",)
+)
+API_CIRCUIT_OPEN = metrics.gauge("api_circuit_open", "Whether the upstream circuit is open")
+
+
+def endpoint_label(endpoint: str) -> str:
+    return NUMERIC_SEGMENT_RE.sub("/{n}", endpoint)
+
 
 class BaseAPIClient:
-    """Base HTTP client with retry logic and error handling."""
+    """
+    Base HTTP client with retry logic and error handling.
+
+    Every upstream attempt passes the optional ``circuit_breaker`` and
+    ``rate_limiter`` first, and failed attempts are retried according to
+    ``retry_policy``, which defaults to ``max_retries`` attempts starting
+    from ``retry_delay``. Connection pooling, per-phase timeouts and
+    compression are set by ``transport``, ``timeout`` bounds a whole attempt.
+    """
 
     def __init__(
         self,
@@ -20,12 +68,29 @@ class BaseAPIClient:
         timeout: float = 30.0,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        cache: ResponseCache | None = None,
+        shared_cache: SharedCache | None = None,
+        shared_cache_ttl: float = 300.0,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        rate_limiter: TokenBucket | None = None,
+        transport: TransportOptions | None = None,
     ):
         self.base_url = base_url.rstrip("/")
-        self.timeout = ClientTimeout(total=timeout)
+        self.transport = transport or TransportOptions()
+        self.timeout = self.transport.timeout(timeout)
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_attempts=max_retries, base_delay=retry_delay
+        )
+        self.circuit_breaker = circuit_breaker
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.shared_cache = shared_cache
+        self.shared_cache_ttl = shared_cache_ttl
         self._session: aiohttp.ClientSession | None = None
+        self._inflight: dict[CacheKey, asyncio.Task] = {}
 
     async def __aenter__(self):
         await self._ensure_session()
@@ -38,10 +103,12 @@ class BaseAPIClient:
         """Ensure session is created."""
         if self._session is None or self._session.closed:
             self._session = aiohttp.ClientSession(
+                connector=self.transport.connector(),
                 timeout=self.timeout,
                 headers={
                     "Accept": "application/json",
                     "Content-Type": "application/json",
+                    **self.transport.headers,
                 },
             )
 
@@ -50,6 +117,28 @@ class BaseAPIClient:
         if self._session and not self._session.closed:
             await self._session.close()
 
+    def pool_stats(self) -> PoolStats:
+        """Current connection pool usage."""
+        return PoolStats.from_session(self._session)
+
+    def export_metrics(self) -> None:
+        """Report pool usage and circuit state of this client in metrics."""
+
+        def pool_connections() -> dict[tuple[str, ...], float]:
+            stats = self.pool_stats()
+            return {
+                ("acquired",): stats.acquired,
+                ("idle",): stats.idle,
+                ("waiting",): stats.waiting,
+            }
+
+        def circuit_open() -> dict[tuple[str, ...], float]:
+            breaker = self.circuit_breaker
+            return {(): float(breaker is not None and breaker.state is not CircuitState.CLOSED)}
+
+        API_POOL_CONNECTIONS.callback = pool_connections
+        API_CIRCUIT_OPEN.callback = circuit_open
+
     def _build_url(self, endpoint: str) -> str:
         """Build full URL for endpoint."""
         return urljoin(f"{self.base_url}/", endpoint.lstrip("/"))
@@ -59,57 +148,88 @@ class BaseAPIClient:
         method: str,
         endpoint: str,
         **kwargs: Any,
-    ) -> dict[str, Any] | list[dict[str, Any]]:
-        """Make HTTP request with retry logic."""
-        last_exception: Exception | None = None
+    ) -> Any:
+        """Make HTTP request, retrying transient failures per ``retry_policy``."""
+        started = time.monotonic()
+        attempt = 0
+        label = endpoint_label(endpoint)
 
-        for attempt in range(self.max_retries):
+        while True:
+            attempt += 1
+            await self._admit(label)
             try:
-                return await self._make_request(method, endpoint, **kwargs)
-
-            except (ClientError, asyncio.TimeoutError) as e:
-                last_exception = e
-
-                if attempt < self.max_retries - 1:
-                    wait_time = self.retry_delay * (2**attempt)  # Exponential backoff
-                    logger.warning(
-                        "Request failed (attempt %d/%d), retrying in %.1fs: %s",
-                        attempt + 1,
-                        self.max_retries,
-                        wait_time,
-                        str(e),
-                    )
-                    await asyncio.sleep(wait_time)
-                else:
-                    logger.error(
-                        "Request failed after %d attempts: %s",
-                        self.max_retries,
-                        str(e),
-                    )
-
-        # If we get here, all retries failed
-        if isinstance(last_exception, asyncio.TimeoutError):
-            raise APITimeoutError(
-                f"Request timeout after {self.max_retries} attempts"
-            ) from last_exception
+                response = await self._make_request(method, endpoint, **kwargs)
+
+            except APIError as e:
+                API_ERRORS.inc(endpoint=label, error=type(e).__name__)
+                self._record_outcome(e)
+                delay = self.retry_policy.next_delay(e, attempt, time.monotonic() - started)
+                if delay is None:
+                    if attempt > 1:
+                        logger.error("Request failed after %d attempts: %s", attempt, str(e))
+                    raise
+
+                logger.warning(
+                    "Request failed (attempt %d/%d), retrying in %.1fs: %s",
+                    attempt,
+                    self.retry_policy.max_attempts,
+                    delay,
+                    str(e),
+                )
+                API_RETRIES.inc(endpoint=label)
+                await asyncio.sleep(delay)
+
+            else:
+                self._record_outcome(None)
+                return response
+
+    async def _admit(self, label: str) -> None:
+        """Wait for the rate limiter, or fail fast while the circuit is open."""
+        if self.circuit_breaker is not None:
+            try:
+                self.circuit_breaker.check()
+            except APICircuitOpenError as e:
+                API_ERRORS.inc(endpoint=label, error=type(e).__name__)
+                raise
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+
+    def _record_outcome(self, error: APIError | None) -> None:
+        if self.circuit_breaker is None:
+            return
+        if error is None:
+            self.circuit_breaker.record_success()
         else:
-            raise APINetworkError(
-                f"Request failed after {self.max_retries} attempts: {str(last_exception)}"
-            ) from last_exception
+            self.circuit_breaker.record_failure(error)
 
     async def _make_request(
         self,
         method: str,
         endpoint: str,
+        model_type: type[BaseModel] | None = None,
         **kwargs: Any,
-    ) -> dict[str, Any] | list[dict[str, Any]]:
-        """Make single HTTP request."""
+    ) -> Any:
+        """
+        Make single HTTP request.
+
+        If ``model_type`` is given, the raw body is validated straight into
+        the model, otherwise decoded JSON is returned.
+        """
         await self._ensure_session()
         url = self._build_url(endpoint)
+        started = time.perf_counter()
+        status = "error"
         try:
             async with self._session.request(method, url, **kwargs) as response:
+                status = str(response.status)
                 response.raise_for_status()
 
+                if model_type is not None:
+                    if response.status == 204:  # No Content
+                        return None
+                    body = await response.read()
+                    return self._parse_model(model_type, body) if body else None
+
                 if response.status == 204:  # No Content
                     return {}
 
@@ -129,24 +249,195 @@ class BaseAPIClient:
             raise APIError(
                 f"API request failed: {e.message}",
                 status_code=e.status,
+                retry_after=parse_retry_after(e.headers.get("Retry-After") if e.headers else None),
             ) from e
 
         except asyncio.TimeoutError as e:
+            status = "timeout"
             logger.error("API request timeout for %s", url)
             raise APITimeoutError(f"Request timeout after {self.timeout.total} seconds") from e
 
         except ClientError as e:
+            status = "network"
             logger.error("Network error for %s: %s", url, str(e))
             raise APINetworkError(f"Network error: {str(e)}") from e
 
+        finally:
+            API_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, endpoint=endpoint_label(endpoint), status=status
+            )
+
+    @asynccontextmanager
+    async def _stream_request(
+        self,
+        method: str,
+        endpoint: str,
+        chunk_size: int = 64 * 1024,
+        **kwargs: Any,
+    ) -> AsyncIterator[AsyncIterator[bytes]]:
+        """
+        Make single HTTP request and expose the body as a stream of chunks.
+
+        Streamed requests pass the circuit breaker and rate limiter but are
+        neither retried, cached nor shared, since the body can only be
+        consumed once. Network errors while the caller reads the body count
+        as failures, and success is recorded only once it is done reading.
+        """
+        await self._ensure_session()
+        await self._admit(endpoint_label(endpoint))
+        url = self._build_url(endpoint)
+        try:
+            async with self._session.request(method, url, **kwargs) as response:
+                response.raise_for_status()
+                yield response.content.iter_chunked(chunk_size)
+            self._record_outcome(None)
+
+        except ClientResponseError as e:
+            logger.error(
+                "API request failed with status %d: %s",
+                e.status,
+                e.message,
+            )
+            error = APIError(
+                f"API request failed: {e.message}",
+                status_code=e.status,
+                retry_after=parse_retry_after(e.headers.get("Retry-After") if e.headers else None),
+            )
+            self._record_outcome(error)
+            raise error from e
+
+        except asyncio.TimeoutError as e:
+            logger.error("API request timeout for %s", url)
+            error = APITimeoutError(f"Request timeout after {self.timeout.total} seconds")
+            self._record_outcome(error)
+            raise error from e
+
+        except ClientError as e:
+            logger.error("Network error for %s: %s", url, str(e))
+            error = APINetworkError(f"Network error: {str(e)}")
+            self._record_outcome(error)
+            raise error from e
+
+    @staticmethod
+    def _parse_model(model_type: type[ModelT], body: bytes) -> ModelT:
+        """Validate raw JSON body into model in a single pass."""
+        try:
+            return model_type.model_validate_json(body)
+        except ValidationError as e:
+            raise APIValidationError(f"Invalid {model_type.__name__} response: {str(e)}") from e
+
+    def _is_cacheable(self, method: str, endpoint: str) -> bool:  # noqa: ARG002
+        """Whether responses for this request may be cached and shared."""
+        return method in ("GET", "POST")
+
     async def _request(
         self,
         method: str,
         endpoint: str,
+        *,
+        use_cache: bool = True,
+        model_type: type[BaseModel] | None = None,
         **kwargs: Any,
-    ) -> dict[str, Any] | list[dict[str, Any]]:
-        """Make HTTP request with retry logic."""
-        return await self._request_with_retry(method, endpoint, **kwargs)
+    ) -> Any:
+        """
+        Make HTTP request with retry logic.
+
+        Cacheable requests are served from cache when possible, and concurrent
+        identical requests share a single upstream call.
+        """
+        if model_type is not None:
+            kwargs["model_type"] = model_type
+
+        if not self._is_cacheable(method, endpoint):
+            return await self._request_with_retry(method, endpoint, **kwargs)
+
+        key = ResponseCache.make_key(
+            method,
+            self._build_url(endpoint),
+            kwargs.get("params"),
+            kwargs.get("json"),
+            variant=model_type.__qualname__ if model_type is not None else "",
+        )
+
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.debug("Cache hit for %s %s", method, endpoint)
+                return cached
+
+        # Requests bypassing cache must not join one that may be served from it
+        inflight_key = key if use_cache else (*key, "fresh")
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            task = asyncio.create_task(
+                self._request_and_store(key, method, endpoint, use_cache, **kwargs)
+            )
+            self._inflight[inflight_key] = task
+            task.add_done_callback(lambda t: self._forget_inflight(inflight_key, t))
+        else:
+            logger.debug("Joining in-flight request %s %s", method, endpoint)
+
+        # Shield so that a cancelled waiter does not cancel the shared request
+        return await asyncio.shield(task)
+
+    async def _request_and_store(
+        self,
+        key: CacheKey,
+        method: str,
+        endpoint: str,
+        use_cache: bool,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Make request, going through the shared cache if any, and store a non-empty response.
+
+        Responses fetched with ``use_cache`` off are kept in neither cache: those
+        are bulk sync downloads that would evict the entries the cache is for.
+        """
+        if self.shared_cache is None or not use_cache:
+            response = await self._request_with_retry(method, endpoint, **kwargs)
+        else:
+            response = await self._request_shared(key, method, endpoint, **kwargs)
+
+        if use_cache and response and self.cache is not None:
+            self.cache.set(key, response)
+        return response
+
+    async def _request_shared(
+        self,
+        key: CacheKey,
+        method: str,
+        endpoint: str,
+        **kwargs: Any,
+    ) -> Any:
+        """Serve request from the shared cache, letting one instance fetch it on a miss."""
+        model_type: type[BaseModel] | None = kwargs.get("model_type")
+        shared_key = "api:" + hashlib.sha256("\0".join(key).encode()).hexdigest()
+        fetched: Any = None
+
+        async def fetch() -> bytes | None:
+            nonlocal fetched
+            fetched = await self._request_with_retry(method, endpoint, **kwargs)
+            if not fetched:
+                return None
+            if model_type is not None:
+                return fetched.model_dump_json(by_alias=True).encode()
+            return json.dumps(fetched, ensure_ascii=False).encode()
+
+        payload = await self.shared_cache.get_or_compute(shared_key, fetch, self.shared_cache_ttl)
+        if fetched is not None or payload is None:
+            return fetched
+        if model_type is not None:
+            return self._parse_model(model_type, payload)
+        return json.loads(payload)
+
+    def _forget_inflight(self, key: CacheKey, task: asyncio.Task) -> None:
+        """Drop finished shared request."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark exception as retrieved in case every waiter was cancelled
+            task.exception()
 
     async def get(
         self,
@@ -166,3 +457,26 @@ class BaseAPIClient:
     ) -> dict[str, Any] | list[dict[str, Any]]:
         """Make POST request."""
         return await self._request("POST", endpoint, data=data, json=json, **kwargs)
+
+    async def get_model(
+        self,
+        endpoint: str,
+        model_type: type[ModelT],
+        params: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> ModelT | None:
+        """Make GET request and validate the response body into ``model_type``."""
+        return await self._request("GET", endpoint, model_type=model_type, params=params, **kwargs)
+
+    async def post_model(
+        self,
+        endpoint: str,
+        model_type: type[ModelT],
+        json: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> ModelT | None:
+        """Make POST request and validate the response body into ``model_type``."""
+        return await self._request(
+            "POST", endpoint, model_type=model_type, json=json, params=params, **kwargs
+        )
@@ -0,0 +1,104 @@
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from core.metrics import record_cache_lookup
+
+CacheKey = tuple[str, ...]
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Response cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResponseCache:
+    """In-memory TTL cache with LRU eviction for decoded API responses."""
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 512, name: str = "api"):
+        self.ttl = ttl
+        self.name = name
+        self.max_entries = max_entries
+        self._entries: OrderedDict[CacheKey, tuple[float, Any]] = OrderedDict()
+        self._stats = CacheStats()
+
+    @staticmethod
+    def make_key(
+        method: str,
+        url: str,
+        params: dict[str, Any] | None = None,
+        json_body: Any = None,
+        variant: str = "",
+    ) -> CacheKey:
+        """
+        Build a cache key from the request method, URL, params and JSON body.
+
+        ``variant`` separates different representations of the same response,
+        e.g. decoded JSON and a validated model.
+        """
+        return (
+            method.upper(),
+            url,
+            json.dumps(params or {}, sort_keys=True, default=str),
+            json.dumps(json_body, sort_keys=True, default=str),
+            variant,
+        )
+
+    def get(self, key: CacheKey) -> Any | None:
+        """Return cached value or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            record_cache_lookup(self.name, hit=False)
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._stats.expirations += 1
+            self._stats.misses += 1
+            record_cache_lookup(self.name, hit=False)
+            return None
+
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        record_cache_lookup(self.name, hit=True)
+        return value
+
+    def set(self, key: CacheKey, value: Any) -> None:
+        """Store value, evicting least recently used entries over the limit."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+
+    def invalidate(self, key: CacheKey) -> None:
+        """Drop a single entry."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        self._stats.size = len(self._entries)
+        return self._stats
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,16 +1,41 @@
+import asyncio
 import logging
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 
 from api.base_client import BaseAPIClient
+from api.cache import ResponseCache
+from api.endpoints import APIConfig
+from api.exceptions import APIError, APIValidationError
+from api.resilience import CircuitBreaker, RetryPolicy
 from api.schemas.requests import ScheduleFilters
 from api.schemas.responses import (
     PaginatedResponse,
     XlsxScheduleDetail,
     XlsxScheduleSummary,
 )
+from api.streaming import ScheduleDetailStream
+from api.transport import TransportOptions
+from core.rate_limit import TokenBucket
+from core.shared_cache import SharedCache
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class ScheduleDetailResult:
+    """Outcome of fetching a single schedule in a bulk request."""
+
+    schedule_id: int
+    detail: XlsxScheduleDetail | None = None
+    error: APIError | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 class ScheduleAPIClient(BaseAPIClient):
     """Client for university schedule API."""
 
@@ -20,10 +45,59 @@ class ScheduleAPIClient(BaseAPIClient):
         timeout: float = 30.0,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        enable_cache: bool = True,
+        cache_ttl: float = 300.0,
+        cache_max_entries: int = 512,
+        shared_cache: SharedCache | None = None,
+        retry_budget: float = 20.0,
+        rate_limit: float | None = None,
+        breaker_threshold: int = 5,
+        breaker_reset_timeout: float = 30.0,
+        transport: TransportOptions | None = None,
     ):
-        super().__init__(base_url, timeout, max_retries, retry_delay)
+        cache = (
+            ResponseCache(ttl=cache_ttl, max_entries=cache_max_entries) if enable_cache else None
+        )
+        super().__init__(
+            base_url,
+            timeout,
+            max_retries,
+            retry_delay,
+            cache=cache,
+            shared_cache=shared_cache,
+            shared_cache_ttl=cache_ttl,
+            retry_policy=RetryPolicy(
+                max_attempts=max_retries, base_delay=retry_delay, budget=retry_budget
+            ),
+            circuit_breaker=CircuitBreaker(breaker_threshold, breaker_reset_timeout),
+            rate_limiter=TokenBucket(rate_limit) if rate_limit else None,
+            transport=transport,
+        )
         self._base_path = "/xlsxSchedule"
 
+    @classmethod
+    def from_config(cls, config: APIConfig) -> "ScheduleAPIClient":
+        """Create client from API configuration."""
+        return cls(
+            base_url=config.base_url,
+            timeout=config.timeout,
+            max_retries=config.max_retries,
+            enable_cache=config.enable_cache,
+            cache_ttl=config.cache_ttl,
+            cache_max_entries=config.cache_max_entries,
+            retry_budget=config.retry_budget,
+            rate_limit=config.rate_limit,
+            breaker_threshold=config.breaker_threshold,
+            breaker_reset_timeout=config.breaker_reset_timeout,
+            transport=config.transport,
+        )
+
+    def _is_cacheable(self, method: str, endpoint: str) -> bool:
+        """Cache only schedule list and detail lookups."""
+        return super()._is_cacheable(method, endpoint) and (
+            "/findAll/" in endpoint or endpoint.endswith("/findById")
+        )
+
     def _build_endpoint(self, path: str) -> str:
         """Build full endpoint path."""
         return f"{self._base_path}/{path.lstrip('/')}"
@@ -33,6 +107,7 @@ class ScheduleAPIClient(BaseAPIClient):
         page: int = 0,
         filters: ScheduleFilters | None = None,
         page_size: int = 20,
+        use_cache: bool = True,
     ) -> PaginatedResponse:
         """
         Get a single page of schedules with optional filtering.
@@ -41,6 +116,7 @@ class ScheduleAPIClient(BaseAPIClient):
             page: Page number (0-based)
             filters: Optional filters for schedules
             page_size: Number of items per page
+            use_cache: Whether the response may be served from cache
 
         Returns:
             PaginatedResponse with schedule summaries for the page
@@ -66,46 +142,171 @@ class ScheduleAPIClient(BaseAPIClient):
             {k: v for k, v in filters_data.items() if v},  # Show only non-empty filters
         )
 
-        response = await self.post(
+        response = await self.post_model(
             endpoint,
+            PaginatedResponse,
             json=filters_data,
             params=params,
+            use_cache=use_cache,
         )
 
-        return PaginatedResponse.model_validate(response)
+        if response is None:
+            raise APIValidationError(f"Empty response for schedules page {page}")
+        return response
 
-    async def get_schedule_details(self, schedule_id: int) -> XlsxScheduleDetail | None:
+    async def fetch_schedule_details(
+        self,
+        schedule_id: int,
+        use_cache: bool = True,
+    ) -> XlsxScheduleDetail | None:
         """
         Get detailed information for a specific schedule.
 
+        Unlike ``get_schedule_details`` errors are not swallowed.
+
         Args:
             schedule_id: Schedule ID
+            use_cache: Whether the response may be served from cache
 
         Returns:
-            Detailed schedule information including lessons
+            Detailed schedule information, or None if the schedule has no content
+
+        Raises:
+            APIError: If the request fails or the response is not a valid schedule
         """
         endpoint = self._build_endpoint("findById")
         params = {"xlsxScheduleId": schedule_id}
 
         logger.info("Fetching details for schedule ID: %d", schedule_id)
 
-        try:
-            response = await self.get(endpoint, params=params)
+        detail = await self.get_model(
+            endpoint, XlsxScheduleDetail, params=params, use_cache=use_cache
+        )
+
+        if detail is None:
+            logger.info("Schedule %d not found or no content", schedule_id)
+        return detail
 
-            if isinstance(response, dict) and not response:
-                logger.info("Schedule %d not found or no content", schedule_id)
-                return None
+    async def get_schedule_details(self, schedule_id: int) -> XlsxScheduleDetail | None:
+        """
+        Get detailed information for a specific schedule.
+
+        Args:
+            schedule_id: Schedule ID
 
-            return XlsxScheduleDetail.model_validate(response)
+        Returns:
+            Detailed schedule information including lessons
+        """
+        try:
+            return await self.fetch_schedule_details(schedule_id)
 
         except Exception as e:
             logger.error("Unexpected error for schedule %d: %s", schedule_id, str(e))
             return None
 
+    @asynccontextmanager
+    async def stream_schedule_details(
+        self,
+        schedule_id: int,
+    ) -> AsyncIterator[ScheduleDetailStream | None]:
+        """
+        Stream detailed information for a specific schedule.
+
+        The response is decoded incrementally, keeping memory flat for
+        schedules with thousands of lessons. Not retried and not cached.
+        An empty response yields None, like ``fetch_schedule_details``.
+
+        Example:
+            async with client.stream_schedule_details(schedule_id) as stream:
+                if stream is None:
+                    return
+                header = await stream.read_header()
+                async for lesson in stream.lessons():
+                    ...
+
+        Args:
+            schedule_id: Schedule ID
+
+        Yields:
+            ScheduleDetailStream over the response body, or None if it is empty
+        """
+        endpoint = self._build_endpoint("findById")
+        params = {"xlsxScheduleId": schedule_id}
+
+        logger.info("Streaming details for schedule ID: %d", schedule_id)
+
+        async with self._stream_request("GET", endpoint, params=params) as chunks:
+            stream = ScheduleDetailStream(chunks)
+            yield None if await stream.is_empty() else stream
+
+    async def _fetch_schedule_result(
+        self,
+        schedule_id: int,
+        use_cache: bool,
+    ) -> ScheduleDetailResult:
+        """Fetch a schedule and wrap the outcome into a result."""
+        try:
+            detail = await self.fetch_schedule_details(schedule_id, use_cache=use_cache)
+        except APIError as e:
+            logger.error("Error fetching schedule %d: %s", schedule_id, str(e))
+            return ScheduleDetailResult(schedule_id, error=e)
+        return ScheduleDetailResult(schedule_id, detail=detail)
+
+    async def iter_schedule_details(
+        self,
+        schedule_ids: Iterable[int],
+        concurrency: int = 5,
+        use_cache: bool = True,
+    ) -> AsyncIterator[ScheduleDetailResult]:
+        """
+        Fetch many schedules concurrently and yield them as they complete.
+
+        At most ``concurrency`` requests are in flight at a time, and a new
+        one is started as soon as a previous one finishes, so only a window
+        of details is held in memory. Results come in completion order.
+
+        Args:
+            schedule_ids: Schedule IDs to fetch
+            concurrency: Maximum number of parallel requests
+            use_cache: Whether responses may be served from cache
+
+        Yields:
+            ScheduleDetailResult per ID, with ``error`` set to the APIError
+            subclass if the request failed and ``detail`` None if the
+            schedule has no content
+        """
+        ids = iter(schedule_ids)
+        pending: set[asyncio.Task[ScheduleDetailResult]] = set()
+
+        def start_next() -> None:
+            schedule_id = next(ids, None)
+            if schedule_id is not None:
+                pending.add(
+                    asyncio.create_task(self._fetch_schedule_result(schedule_id, use_cache))
+                )
+
+        try:
+            for _ in range(max(concurrency, 1)):
+                start_next()
+
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.discard(task)
+                    start_next()
+                    yield task.result()
+
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def search_schedules(
         self,
         filters: ScheduleFilters | None = None,
         max_pages: int = 5,
+        concurrency: int = 1,
+        use_cache: bool = True,
+        strict: bool = False,
     ) -> list[XlsxScheduleSummary]:
         """
         Search schedules across multiple pages (pagination).
@@ -113,12 +314,18 @@ class ScheduleAPIClient(BaseAPIClient):
         Args:
             filters: Optional filters for schedules
             max_pages: Maximum number of pages to fetch
-            page_size: Number of items per page
+            concurrency: Maximum number of pages fetched in parallel.
+                With 1 pages are fetched one by one until the last page.
+            use_cache: Whether responses may be served from cache
+            strict: Raise instead of returning fewer schedules than
+                ``total_elements`` of the first page, e.g. after a failed page
 
         Returns:
             Combined list of schedule summaries from all fetched pages
+
+        Raises:
+            APIValidationError: In strict mode, if the result is incomplete
         """
-        all_schedules: list[XlsxScheduleSummary] = []
         filters = filters or ScheduleFilters()
 
         logger.info(
@@ -127,14 +334,40 @@ class ScheduleAPIClient(BaseAPIClient):
             filters.model_dump(exclude_none=True, by_alias=True),
         )
 
+        if concurrency > 1:
+            all_schedules = await self._search_schedules_concurrent(
+                filters, max_pages, concurrency, use_cache, strict
+            )
+        else:
+            all_schedules = await self._search_schedules_sequential(
+                filters, max_pages, use_cache, strict
+            )
+
+        logger.info("Search completed, found %d schedules total", len(all_schedules))
+        return all_schedules
+
+    async def _search_schedules_sequential(
+        self,
+        filters: ScheduleFilters,
+        max_pages: int,
+        use_cache: bool,
+        strict: bool,
+    ) -> list[XlsxScheduleSummary]:
+        """Fetch pages one after another until the last page."""
+        all_schedules: list[XlsxScheduleSummary] = []
+        total_elements = 0
+
         for page in range(max_pages):
             try:
                 logger.debug("Fetching page %d/%d", page + 1, max_pages)
                 response = await self.get_schedules_page(
                     page=page,
                     filters=filters,
+                    use_cache=use_cache,
                 )
 
+                if page == 0:
+                    total_elements = response.total_elements
                 schedules_on_page = response.content
                 all_schedules.extend(schedules_on_page)
 
@@ -152,21 +385,106 @@ class ScheduleAPIClient(BaseAPIClient):
 
             except Exception as e:
                 logger.error("Error fetching page %d: %s", page, str(e))
-                if page == 0:  # Re-raise if first page fails
+                if page == 0 or strict:  # Re-raise if first page fails
                     raise
                 break
 
-        logger.info("Search completed, found %d schedules total", len(all_schedules))
+        if strict:
+            _check_complete(all_schedules, total_elements)
+        return all_schedules
+
+    async def _search_schedules_concurrent(
+        self,
+        filters: ScheduleFilters,
+        max_pages: int,
+        concurrency: int,
+        use_cache: bool,
+        strict: bool,
+    ) -> list[XlsxScheduleSummary]:
+        """
+        Fetch the first page, then the remaining pages in parallel.
+
+        The number of pages is taken from ``total_pages`` of the first page.
+        Pages are merged in page order, so the ``id,desc`` sorting is kept.
+        As in sequential mode, results are truncated at the first failed
+        or empty page unless ``strict``, and a failure of the first page is
+        re-raised.
+        """
+        first_page = await self.get_schedules_page(page=0, filters=filters, use_cache=use_cache)
+        all_schedules: list[XlsxScheduleSummary] = list(first_page.content)
+
+        total_pages = min(first_page.total_pages, max_pages)
+        if first_page.last or not first_page.content or total_pages <= 1:
+            if strict:
+                _check_complete(all_schedules, first_page.total_elements)
+            return all_schedules
+
+        logger.debug(
+            "Fetching pages 2..%d with concurrency %d",
+            total_pages,
+            concurrency,
+        )
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_page(page: int) -> PaginatedResponse:
+            async with semaphore:
+                return await self.get_schedules_page(
+                    page=page, filters=filters, use_cache=use_cache
+                )
+
+        responses = await asyncio.gather(
+            *(fetch_page(page) for page in range(1, total_pages)),
+            return_exceptions=True,
+        )
+
+        for page, response in enumerate(responses, start=1):
+            if isinstance(response, BaseException):
+                logger.error("Error fetching page %d: %s", page, str(response))
+                if strict:
+                    raise response
+                break
+
+            all_schedules.extend(response.content)
+
+            if response.last or not response.content:
+                logger.debug("Reached last page or empty page, stopping")
+                break
+
+        if strict:
+            _check_complete(all_schedules, first_page.total_elements)
         return all_schedules
 
     async def get_all_schedules(
         self,
+        concurrency: int = 5,
+        use_cache: bool = True,
+        strict: bool = False,
     ) -> list[XlsxScheduleSummary]:
         """
         Get all available schedules (no filters).
 
+        Args:
+            concurrency: Maximum number of pages fetched in parallel
+            use_cache: Whether responses may be served from cache
+            strict: Raise if any page failed or schedules are missing
+
         Returns:
             All schedule summaries
         """
         logger.info("Fetching all schedules")
-        return await self.search_schedules(filters=None, max_pages=100)
+        return await self.search_schedules(
+            filters=None,
+            max_pages=100,
+            concurrency=concurrency,
+            use_cache=use_cache,
+            strict=strict,
+        )
+
+
+def _check_complete(schedules: list[XlsxScheduleSummary], total_elements: int) -> None:
+    """Raise if pages missed schedules, e.g. ones shifted by changes while crawling."""
+    found = len({schedule.id for schedule in schedules})
+    if found < total_elements:
+        raise APIValidationError(
+            f"Incomplete schedule list: {found} of {total_elements} schedules fetched"
+        )
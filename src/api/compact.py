@@ -0,0 +1,206 @@
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from api.schemas.responses import ScheduleLesson, XlsxScheduleDetail
+
+# ScheduleLesson string fields stored as dictionary-encoded columns
+STRING_FIELDS: tuple[str, ...] = (
+    "subject_name",
+    "pair_time",
+    "department_name",
+    "day_name",
+    "week_number",
+    "group_type_name",
+    "lector_name",
+    "auditory_number",
+    "location_address",
+    "study_group",
+    "subgroup",
+    "group_stream",
+    "file_name",
+    "lesson_type",
+    "speciality",
+    "semester",
+    "academic_year",
+    "course_number",
+)
+
+
+class StringPool:
+    """Dictionary of interned strings shared by all columns. Code 0 is None."""
+
+    __slots__ = ("_codes", "_values")
+
+    def __init__(self) -> None:
+        self._values: list[str | None] = [None]
+        self._codes: dict[str, int] = {}
+
+    def encode(self, value: str | None) -> int:
+        if value is None:
+            return 0
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            self._values.append(value)
+            self._codes[value] = code
+        return code
+
+    def decode(self, code: int) -> str | None:
+        return self._values[code]
+
+    def lookup(self, value: str | None) -> int | None:
+        """Return code for value without adding it."""
+        return 0 if value is None else self._codes.get(value)
+
+    def __len__(self) -> int:
+        return len(self._values) - 1
+
+
+class LessonRow:
+    """Lightweight view of a single lesson in a LessonTable."""
+
+    __slots__ = ("_index", "_table")
+
+    def __init__(self, table: "LessonTable", index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def id(self) -> int:
+        return self._table.ids[self._index]
+
+    @property
+    def schedule_id(self) -> int:
+        return self._table.schedule_ids[self._index]
+
+    @property
+    def error_list(self) -> list[str] | None:
+        return self._table.error_lists.get(self._index)
+
+    def __getattr__(self, name: str) -> str | None:
+        column = self._table.columns.get(name)
+        if column is None:
+            raise AttributeError(name)
+        return self._table.pool.decode(column[self._index])
+
+    def to_lesson(self) -> ScheduleLesson:
+        return self._table.lesson(self._index)
+
+    def __repr__(self) -> str:
+        return f"LessonRow(id={self.id}, subject_name={self.subject_name!r})"
+
+
+class LessonTable:
+    """
+    Columnar, dictionary-encoded storage for schedule lessons.
+
+    Every string field is stored as an ``array`` of codes into a shared
+    ``StringPool``, so each distinct string is kept once no matter how many
+    lessons repeat it. Rows are materialized on demand as ``LessonRow``
+    views or ``ScheduleLesson`` models.
+    """
+
+    __slots__ = ("columns", "error_lists", "ids", "pool", "schedule_ids")
+
+    def __init__(self, pool: StringPool | None = None):
+        self.pool = pool or StringPool()
+        self.ids = array("q")
+        self.schedule_ids = array("q")
+        self.columns: dict[str, array] = {name: array("I") for name in STRING_FIELDS}
+        self.error_lists: dict[int, list[str]] = {}
+
+    @classmethod
+    def from_lessons(
+        cls,
+        lessons: Iterable[ScheduleLesson],
+        pool: StringPool | None = None,
+    ) -> "LessonTable":
+        table = cls(pool)
+        table.extend(lessons)
+        return table
+
+    def append(self, lesson: ScheduleLesson) -> None:
+        encode = self.pool.encode
+        index = len(self.ids)
+        self.ids.append(lesson.id)
+        self.schedule_ids.append(lesson.schedule_id)
+        for name, column in self.columns.items():
+            column.append(encode(getattr(lesson, name)))
+        if lesson.error_list is not None:
+            self.error_lists[index] = lesson.error_list
+
+    def extend(self, lessons: Iterable[ScheduleLesson]) -> None:
+        for lesson in lessons:
+            self.append(lesson)
+
+    def lesson(self, index: int) -> ScheduleLesson:
+        """Materialize row as a ScheduleLesson model."""
+        decode = self.pool.decode
+        values: dict[str, Any] = {
+            name: decode(column[index]) for name, column in self.columns.items()
+        }
+        values["id"] = self.ids[index]
+        values["schedule_id"] = self.schedule_ids[index]
+        values["error_list"] = self.error_lists.get(index)
+        return ScheduleLesson.model_validate(values)
+
+    def select(self, **equals: str | None) -> Iterator[LessonRow]:
+        """Yield rows whose string fields equal the given values, comparing codes."""
+        filters: list[tuple[array, int]] = []
+        for name, value in equals.items():
+            code = self.pool.lookup(value)
+            if code is None:
+                return
+            filters.append((self.columns[name], code))
+
+        for index in range(len(self.ids)):
+            if all(column[index] == code for column, code in filters):
+                yield LessonRow(self, index)
+
+    def to_lessons(self) -> list[ScheduleLesson]:
+        return [self.lesson(index) for index in range(len(self.ids))]
+
+    def __getitem__(self, index: int) -> LessonRow:
+        if not -len(self.ids) <= index < len(self.ids):
+            raise IndexError(index)
+        return LessonRow(self, index % len(self.ids))
+
+    def __iter__(self) -> Iterator[LessonRow]:
+        return (LessonRow(self, index) for index in range(len(self.ids)))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class CompactSchedule:
+    """Compact read-model of an XlsxScheduleDetail."""
+
+    __slots__ = ("detail", "lessons")
+
+    def __init__(self, detail: XlsxScheduleDetail, lessons: LessonTable):
+        # Detail without lessons, keeping header fields as they are
+        self.detail = detail
+        self.lessons = lessons
+
+    @classmethod
+    def from_detail(
+        cls,
+        detail: XlsxScheduleDetail,
+        pool: StringPool | None = None,
+    ) -> "CompactSchedule":
+        """
+        Build compact schedule. Pass a shared ``pool`` to deduplicate
+        strings across many schedules.
+        """
+        lessons = LessonTable.from_lessons(detail.schedule_lesson_dto_list, pool)
+        return cls(detail.model_copy(update={"schedule_lesson_dto_list": []}), lessons)
+
+    def to_detail(self) -> XlsxScheduleDetail:
+        return self.detail.model_copy(
+            update={"schedule_lesson_dto_list": self.lessons.to_lessons()}
+        )
+
+    @property
+    def id(self) -> int:
+        return self.detail.id
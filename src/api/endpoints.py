@@ -1,6 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 
+from api.transport import TransportOptions
+
 
 class ScheduleEndpoint:
     """Schedule-related API endpoints."""
@@ -36,3 +38,9 @@ class APIConfig:
     max_retries: int = 3
     enable_cache: bool = True
     cache_ttl: int = 300  # 5 minutes
+    cache_max_entries: int = 512
+    retry_budget: float = 20.0  # seconds per call, retries included
+    rate_limit: float | None = None  # requests per second
+    breaker_threshold: int = 5
+    breaker_reset_timeout: float = 30.0
+    transport: TransportOptions = field(default_factory=TransportOptions)
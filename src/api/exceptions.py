@@ -1,9 +1,15 @@
 class APIError(Exception):
     """Base exception for API errors."""
 
-    def __init__(self, message: str, status_code: int | None = None):
+    def __init__(
+        self,
+        message: str,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+    ):
         self.message = message
         self.status_code = status_code
+        self.retry_after = retry_after
         super().__init__(self.message)
 
 
@@ -23,3 +29,9 @@ class APIValidationError(APIError):
     """API response validation error."""
 
     pass
+
+
+class APICircuitOpenError(APIError):
+    """Request rejected without calling upstream while it is unavailable."""
+
+    pass
@@ -0,0 +1,124 @@
+import datetime
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from enum import Enum
+
+from api.exceptions import (
+    APICircuitOpenError,
+    APIError,
+    APINetworkError,
+    APITimeoutError,
+    APIValidationError,
+)
+
+# Upstream is overloaded or restarting, the same request may succeed later
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse ``Retry-After`` header given in seconds or as HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        at = parsedate_to_datetime(value)
+    except ValueError:
+        return None
+    return max(0.0, (at - datetime.datetime.now(datetime.UTC)).total_seconds())
+
+
+def is_transient(error: APIError) -> bool:
+    """Whether the error says nothing about the request itself and may go away."""
+    if isinstance(error, APIValidationError | APICircuitOpenError):
+        return False
+    if isinstance(error, APINetworkError | APITimeoutError):
+        return True
+    return error.status_code in RETRY_STATUSES
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """
+    Retry policy by error class.
+
+    Network errors, timeouts and ``RETRY_STATUSES`` are retried with full
+    jitter exponential backoff, other client errors fail at once.
+    ``Retry-After`` overrides the backoff, and a call gives up when the next
+    wait would exceed ``budget`` seconds since its start.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 10.0
+    budget: float = 20.0
+
+    def backoff(self, attempt: int) -> float:
+        """Jittered delay before retry number ``attempt``, starting from 1."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))  # noqa: S311
+
+    def next_delay(self, error: APIError, attempt: int, elapsed: float) -> float | None:
+        """Seconds to wait before the next attempt, or None to give up."""
+        if attempt >= self.max_attempts or not is_transient(error):
+            return None
+        delay = error.retry_after if error.retry_after is not None else self.backoff(attempt)
+        if elapsed + delay > self.budget:
+            return None
+        return delay
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker over consecutive transient failures.
+
+    After ``failure_threshold`` failures in a row the circuit opens and
+    calls fail at once with ``APICircuitOpenError``. After ``reset_timeout``
+    seconds a single probe call is let through, closing the circuit on
+    success and opening it again on failure. Any answer other than a
+    transient error counts as success.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    def check(self) -> None:
+        """Raise ``APICircuitOpenError`` unless a call may go through."""
+        if self.state is CircuitState.CLOSED:
+            return
+        remaining = self._opened_at + self.reset_timeout - time.monotonic()
+        if remaining > 0:
+            raise APICircuitOpenError(
+                f"Circuit {self.state.value}, upstream unavailable for {remaining:.0f}s more",
+                retry_after=remaining,
+            )
+        # Let one probe through; if it never reports back, the next one goes
+        # after another reset_timeout
+        self.state = CircuitState.HALF_OPEN
+        self._opened_at = time.monotonic()
+
+    def record_success(self) -> None:
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+
+    def record_failure(self, error: APIError) -> None:
+        if not is_transient(error):
+            # Upstream answered, so it is alive
+            self.record_success()
+            return
+        self._failures += 1
+        if self.state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            self.state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
@@ -0,0 +1,177 @@
+import codecs
+import json
+import sys
+from collections.abc import AsyncIterator
+from typing import Any
+
+from pydantic import ValidationError
+
+from api.exceptions import APIValidationError
+from api.schemas.responses import ScheduleLesson, XlsxHeader
+
+LESSONS_KEY = "scheduleLessonDtoList"
+WHITESPACE = " \t\n\r"
+
+
+def _intern_pairs(pairs: list[tuple[str, Any]]) -> dict[str, Any]:
+    """Build object interning string values, which repeat across lessons."""
+    return {key: sys.intern(value) if type(value) is str else value for key, value in pairs}
+
+
+class JSONChunkReader:
+    """Incremental JSON tokenizer over a stream of byte chunks."""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder(object_pairs_hook=_intern_pairs)
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    async def _fill(self) -> bool:
+        """Read next chunk into buffer, dropping consumed text. False at end of stream."""
+        if self._eof:
+            return False
+
+        chunk = await anext(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            text = self._text_decoder.decode(b"", final=True)
+        else:
+            text = self._text_decoder.decode(chunk)
+
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+        return chunk is not None or bool(text)
+
+    async def at_end(self) -> bool:
+        """Whether nothing but whitespace is left in the stream."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return False
+            if not await self._fill():
+                return True
+
+    async def peek(self) -> str:
+        """Return next non-whitespace character without consuming it."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not await self._fill():
+                raise APIValidationError("Unexpected end of JSON stream")
+
+    async def expect(self, *chars: str) -> str:
+        """Consume next non-whitespace character, which must be one of ``chars``."""
+        char = await self.peek()
+        if char not in chars:
+            raise APIValidationError(f"Expected one of {chars!r} in JSON stream, got {char!r}")
+        self._pos += 1
+        return char
+
+    async def value(self) -> Any:
+        """Decode next complete JSON value."""
+        await self.peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if await self._fill():
+                    continue
+                raise APIValidationError(f"Invalid JSON in stream: {str(e)}") from e
+
+            # A number or literal at the very end of the buffer may be truncated
+            if end == len(self._buffer) and await self._fill():
+                continue
+
+            self._pos = end
+            return value
+
+
+class ScheduleDetailStream:
+    """
+    Incremental decoder of a ``findById`` response.
+
+    Top-level fields are collected into ``fields``, and lessons from
+    ``scheduleLessonDtoList`` are validated and yielded one at a time,
+    so the full lesson list is never held in memory. Fields that precede
+    the lesson list are available after ``read_header``, the rest once
+    ``lessons`` is exhausted.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._reader = JSONChunkReader(chunks)
+        self.fields: dict[str, Any] = {}
+        self._started = False
+        self._in_lessons = False
+        self._finished = False
+
+    async def is_empty(self) -> bool:
+        """Whether the response has no body at all, as for 204 No Content."""
+        return not self._started and await self._reader.at_end()
+
+    async def read_header(self) -> dict[str, Any]:
+        """Read top-level fields up to the start of the lesson list."""
+        if not self._started:
+            self._started = True
+            await self._reader.expect("{")
+            if await self._reader.peek() == "}":
+                await self._reader.expect("}")
+                self._finished = True
+            else:
+                await self._read_members()
+        return self.fields
+
+    @property
+    def headers(self) -> list[XlsxHeader]:
+        """Validated ``xlsxHeaderDto`` entries read so far."""
+        return [
+            XlsxHeader.model_validate(header) for header in self.fields.get("xlsxHeaderDto", [])
+        ]
+
+    async def lessons(self) -> AsyncIterator[ScheduleLesson]:
+        """Yield lessons as they are decoded from the stream."""
+        await self.read_header()
+        if not self._in_lessons:
+            return
+
+        reader = self._reader
+        if await reader.peek() == "]":
+            await reader.expect("]")
+        else:
+            while True:
+                data = await reader.value()
+                try:
+                    lesson = ScheduleLesson.model_validate(data)
+                except ValidationError as e:
+                    raise APIValidationError(f"Invalid lesson in stream: {str(e)}") from e
+                yield lesson
+                if await reader.expect(",", "]") == "]":
+                    break
+
+        self._in_lessons = False
+        if await reader.expect(",", "}") == ",":
+            await self._read_members()
+        else:
+            self._finished = True
+
+    async def _read_members(self) -> None:
+        """Read object members until the lesson list starts or the object ends."""
+        reader = self._reader
+        while True:
+            key = await reader.value()
+            await reader.expect(":")
+
+            if key == LESSONS_KEY and await reader.peek() == "[":
+                await reader.expect("[")
+                self._in_lessons = True
+                return
+
+            self.fields[key] = await reader.value()
+            if await reader.expect(",", "}") == "}":
+                self._finished = True
+                return
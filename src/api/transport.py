@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+
+import aiohttp
+from aiohttp import ClientTimeout, TCPConnector
+
+try:
+    from aiohttp.client_reqrep import HAS_BROTLI
+except ImportError:  # pragma: no cover - private in aiohttp
+    HAS_BROTLI = False
+
+# aiohttp decompresses these transparently, brotli needs Brotli or brotlicffi
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+
+@dataclass(frozen=True, slots=True)
+class TransportOptions:
+    """
+    Connection pool and timeout settings of the HTTP transport.
+
+    Connections are kept alive for ``keepalive_timeout`` seconds so bursts
+    reuse them instead of paying a TLS handshake each, and resolved
+    addresses are cached for ``dns_cache_ttl`` seconds.
+    """
+
+    limit: int = 100
+    limit_per_host: int = 20
+    keepalive_timeout: float = 60.0
+    dns_cache_ttl: int = 300
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    compression: bool = True
+
+    def connector(self) -> TCPConnector:
+        return TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=self.dns_cache_ttl > 0,
+            ttl_dns_cache=self.dns_cache_ttl or None,
+        )
+
+    def timeout(self, total: float | None) -> ClientTimeout:
+        """``connect`` covers waiting for a pooled connection, ``sock_read`` each read."""
+        return ClientTimeout(
+            total=total,
+            connect=self.connect_timeout,
+            sock_read=self.read_timeout,
+        )
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Accept-Encoding": ACCEPT_ENCODING if self.compression else "identity"}
+
+
+@dataclass(frozen=True, slots=True)
+class PoolStats:
+    """Snapshot of connector pool usage."""
+
+    limit: int
+    limit_per_host: int
+    acquired: int
+    idle: int
+    waiting: int
+
+    @property
+    def open(self) -> int:
+        return self.acquired + self.idle
+
+    @classmethod
+    def from_session(cls, session: aiohttp.ClientSession | None) -> "PoolStats":
+        connector = session.connector if session is not None and not session.closed else None
+        if connector is None:
+            return cls(0, 0, 0, 0, 0)
+        # aiohttp keeps pool state in private attributes only
+        conns = getattr(connector, "_conns", {})
+        waiters = getattr(connector, "_waiters", {})
+        return cls(
+            limit=connector.limit,
+            limit_per_host=connector.limit_per_host,
+            acquired=len(getattr(connector, "_acquired", ())),
+            idle=sum(len(host_conns) for host_conns in conns.values()),
+            waiting=sum(len(host_waiters) for host_waiters in waiters.values()),
+        )
@@ -0,0 +1,52 @@
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject, Update
+
+from core import metrics
+
+UPDATE_SECONDS = metrics.histogram(
+    "update_processing_duration_seconds", "Telegram updates by type", ("event_type",)
+)
+HANDLER_SECONDS = metrics.histogram(
+    "handler_duration_seconds", "Telegram handlers by name and outcome", ("handler", "status")
+)
+
+Handler = Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]]
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Outer update middleware timing the whole update, filters and middlewares included."""
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: dict[str, Any]) -> Any:
+        event_type = event.event_type if isinstance(event, Update) else type(event).__name__
+        with UPDATE_SECONDS.time(event_type=event_type):
+            return await handler(event, data)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Inner middleware timing the matched handler."""
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: dict[str, Any]) -> Any:
+        handler_object = data.get("handler")
+        name = handler_object.callback.__qualname__ if handler_object is not None else "unknown"
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            return await handler(event, data)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            HANDLER_SECONDS.observe(time.perf_counter() - started, handler=name, status=status)
+
+
+def setup_metrics(dispatcher: Dispatcher) -> None:
+    """Register metrics middlewares, inner ones also apply to nested routers."""
+    dispatcher.update.outer_middleware(UpdateMetricsMiddleware())
+    handler_middleware = HandlerMetricsMiddleware()
+    for name, observer in dispatcher.observers.items():
+        if name not in ("update", "error"):
+            observer.middleware(handler_middleware)
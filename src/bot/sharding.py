@@ -0,0 +1,201 @@
+import asyncio
+import logging
+from collections.abc import Coroutine, Hashable
+from functools import partial
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import Update
+from pydantic import ValidationError
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+POP_TIMEOUT = 5
+ERROR_DELAY = 1.0
+
+
+def update_user_id(update: Update) -> int:
+    """Telegram id of the user (or chat) the update belongs to, 0 if there is none."""
+    try:
+        event = update.event
+    except Exception:
+        return 0
+    for attribute in ("from_user", "user", "chat"):
+        owner = getattr(event, attribute, None)
+        if owner is not None:
+            return owner.id
+    return 0
+
+
+def shard_for(telegram_id: int, shards: int) -> int:
+    return telegram_id % shards
+
+
+def shard_queue(shard: int, namespace: str = "szgmu") -> str:
+    """Redis list with updates of a shard."""
+    return f"{namespace}:updates:{shard}"
+
+
+class KeyedSerializer:
+    """
+    Runs coroutines concurrently across keys but one at a time per key.
+
+    Each coroutine waits for the previous one with the same key, so updates
+    of a user are handled in arrival order. At most ``max_pending``
+    coroutines are queued or running, ``submit`` waits for a free slot.
+    """
+
+    def __init__(self, max_pending: int = 1000):
+        self._semaphore = asyncio.Semaphore(max_pending)
+        self._tails: dict[Hashable, asyncio.Task] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, key: Hashable, coro: Coroutine[Any, Any, Any]) -> None:
+        await self._semaphore.acquire()
+        task = asyncio.create_task(self._run(self._tails.get(key), coro))
+        self._tails[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(partial(self._done, key))
+
+    @staticmethod
+    async def _run(previous: asyncio.Task | None, coro: Coroutine[Any, Any, Any]) -> None:
+        try:
+            if previous is not None:
+                await asyncio.wait({previous})
+        except asyncio.CancelledError:
+            coro.close()
+            raise
+        await coro
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        self._semaphore.release()
+        self._tasks.discard(task)
+        if self._tails.get(key) is task:
+            del self._tails[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Failed to handle update of %s", key, exc_info=task.exception())
+
+    async def close(self) -> None:
+        """Cancel pending coroutines and wait for them to finish."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+
+class UpdateRouter:
+    """
+    Long-polls Telegram and pushes updates to per-shard Redis queues.
+
+    Updates go to shard ``telegram_id % shards``, so all updates of a user
+    reach the same worker. The polling offset is stored next to the queues
+    and advanced in the same transaction, so a new leader resumes where the
+    previous one stopped. Only one router may run at a time.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        redis: Redis,
+        shards: int,
+        namespace: str = "szgmu",
+        polling_timeout: int = 30,
+        allowed_updates: list[str] | None = None,
+    ):
+        self.bot = bot
+        self.redis = redis
+        self.shards = shards
+        self.namespace = namespace
+        self.polling_timeout = polling_timeout
+        self.allowed_updates = allowed_updates
+
+    def queue(self, shard: int) -> str:
+        return shard_queue(shard, self.namespace)
+
+    @property
+    def _offset_key(self) -> str:
+        return f"{self.namespace}:updates:offset"
+
+    async def run(self) -> None:
+        """Route updates until cancelled."""
+        offset = await self.redis.get(self._offset_key)
+        offset = int(offset) if offset is not None else None
+        logger.info("Routing updates to %d shards from offset %s", self.shards, offset)
+
+        while True:
+            try:
+                updates = await self.bot.get_updates(
+                    offset=offset,
+                    timeout=self.polling_timeout,
+                    allowed_updates=self.allowed_updates,
+                )
+            except TelegramAPIError as e:
+                logger.warning("Failed to get updates: %s", str(e))
+                await asyncio.sleep(ERROR_DELAY)
+                continue
+
+            if not updates:
+                continue
+
+            offset = updates[-1].update_id + 1
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for update in updates:
+                    shard = shard_for(update_user_id(update), self.shards)
+                    pipe.rpush(self.queue(shard), update.model_dump_json(exclude_unset=True))
+                pipe.set(self._offset_key, offset)
+                await pipe.execute()
+
+
+class ShardConsumer:
+    """
+    Feeds updates of one shard queue into the dispatcher.
+
+    Different users are handled concurrently, updates of one user in order
+    through ``KeyedSerializer``.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        dispatcher: Dispatcher,
+        redis: Redis,
+        queue: str,
+        max_pending: int = 1000,
+    ):
+        self.bot = bot
+        self.dispatcher = dispatcher
+        self.redis = redis
+        self.queue = queue
+        self.serializer = KeyedSerializer(max_pending)
+
+    async def run(self) -> None:
+        """Consume updates until cancelled."""
+        logger.info("Consuming updates from %s", self.queue)
+        try:
+            while True:
+                try:
+                    item = await self.redis.blpop([self.queue], timeout=POP_TIMEOUT)
+                except RedisError as e:
+                    logger.warning("Failed to pop update from %s: %s", self.queue, str(e))
+                    await asyncio.sleep(ERROR_DELAY)
+                    continue
+
+                if item is None:
+                    continue
+
+                try:
+                    update = Update.model_validate_json(item[1], context={"bot": self.bot})
+                except ValidationError as e:
+                    logger.error("Dropping malformed update: %s", str(e))
+                    continue
+
+                await self.serializer.submit(
+                    update_user_id(update), self.dispatcher.feed_update(self.bot, update)
+                )
+        finally:
+            await self.serializer.close()
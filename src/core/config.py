@@ -1,8 +1,10 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic import (
     Field,
     HttpUrl,
+    PositiveFloat,
     PositiveInt,
     SecretStr,
 )
@@ -54,7 +56,7 @@ class RedisSettings(ConfigBase):
     @property
     def dsn(self) -> str:
         if self.password:
-            return f"redis://{self.password.get_secret_value()}@{self.host}:{self.port}/{self.database}"
+            return f"redis://:{self.password.get_secret_value()}@{self.host}:{self.port}/{self.database}"
         return f"redis://{self.host}:{self.port}/{self.database}"
 
 
@@ -63,6 +65,109 @@ class APISettings(ConfigBase):
 
     schedule_url: HttpUrl = Field(..., description="University schedule API")
     timeout_seconds: PositiveInt = Field(default=30)
+    max_retries: PositiveInt = Field(default=3, description="Attempts per request")
+    retry_budget_seconds: PositiveFloat = Field(
+        default=20.0, description="Max time per request, retries included"
+    )
+    rate_limit: PositiveFloat = Field(default=10.0, description="Requests per second to upstream")
+    breaker_threshold: PositiveInt = Field(
+        default=5, description="Consecutive failures before failing fast"
+    )
+    breaker_reset_seconds: PositiveFloat = Field(
+        default=30.0, description="Time before probing upstream again"
+    )
+    connect_timeout_seconds: PositiveFloat = Field(
+        default=5.0, description="Getting a pooled or new connection"
+    )
+    read_timeout_seconds: PositiveFloat = Field(default=30.0, description="Single socket read")
+    pool_limit: PositiveInt = Field(default=100, description="Open connections in total")
+    pool_limit_per_host: PositiveInt = Field(default=20, description="Open connections per host")
+    keepalive_seconds: PositiveFloat = Field(default=60.0, description="Idle connection lifetime")
+    dns_cache_seconds: int = Field(default=300, ge=0, description="0 disables DNS caching")
+    compression: bool = Field(default=True, description="Negotiate gzip/brotli responses")
+
+
+class SyncSettings(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="SYNC_")
+
+    interval_seconds: PositiveInt = Field(default=900, description="Delay between sync runs")
+    concurrency: PositiveInt = Field(default=5, description="Parallel schedule downloads")
+    recheck_after_seconds: PositiveInt = Field(
+        default=6 * 3600, description="Re-download unchanged schedules after this period"
+    )
+    autumn_semester_start: str = Field(default="09-01", description="MM-DD, first academic year")
+    spring_semester_start: str = Field(default="02-09", description="MM-DD, second academic year")
+    semester_weeks: PositiveInt = Field(default=22, description="Max weeks in a semester")
+    write_batch_size: PositiveInt = Field(default=5000, description="Rows per COPY batch")
+
+
+class NotificationSettings(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="NOTIFY_")
+
+    timezone: str = Field(default="Europe/Moscow", description="Timezone of notification_time")
+    global_rate: PositiveFloat = Field(default=25.0, description="Messages per second, all chats")
+    per_chat_rate: PositiveFloat = Field(default=1.0, description="Messages per second, one chat")
+    concurrency: PositiveInt = Field(default=50, description="Parallel send requests")
+    reload_interval_seconds: PositiveInt = Field(
+        default=600, description="Reload subscribers from the database"
+    )
+    changes_enabled: bool = Field(default=True, description="Tell subscribers about changes")
+    changes_horizon_days: PositiveInt = Field(
+        default=14, description="Only report changes to lessons this many days ahead"
+    )
+
+
+class WorkerSettings(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="WORKER_")
+
+    count: PositiveInt = Field(default=1, description="Worker processes sharing updates")
+    index: int | None = Field(
+        default=None, ge=0, description="Shard of this process, all shards are spawned if unset"
+    )
+    leader_ttl_seconds: PositiveInt = Field(
+        default=30, description="Leader lock lifetime, renewed every third of it"
+    )
+    max_pending_updates: PositiveInt = Field(
+        default=1000, description="Updates handled concurrently by one worker"
+    )
+    navigation_poll_seconds: PositiveFloat = Field(
+        default=5.0, description="Check for a navigation tree rebuilt by the leader"
+    )
+
+
+class SearchSettings(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="SEARCH_")
+
+    backend: Literal["memory", "pg_trgm"] = Field(
+        default="memory", description="In-process index or pg_trgm, which needs the extension"
+    )
+    min_score: float = Field(default=0.3, ge=0, le=1, description="Minimum match score")
+
+
+class CalendarSettings(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="CALENDAR_")
+
+    enabled: bool = Field(default=False, description="Serve iCalendar feeds of subgroups")
+    host: str = Field(default="127.0.0.1", description="Calendar server address")
+    port: int = Field(default=9200, description="Calendar port, plus shard index per worker")
+    timezone: str = Field(default="Europe/Moscow", description="Timezone of lesson times")
+    max_age_seconds: PositiveInt = Field(
+        default=300, description="How long clients may reuse a feed without asking"
+    )
+    cache_ttl_seconds: PositiveInt = Field(
+        default=86400, description="Lifetime of feeds in the shared cache"
+    )
+    max_cached_bytes: PositiveInt = Field(
+        default=64 * 1024 * 1024, description="Feeds kept in memory by each worker"
+    )
+
+
+class MetricsSettings(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="METRICS_")
+
+    enabled: bool = Field(default=True, description="Serve Prometheus metrics")
+    host: str = Field(default="127.0.0.1", description="Metrics server address")
+    port: int = Field(default=9100, description="Metrics port, plus shard index per worker")
 
 
 class AppSettings(ConfigBase):
@@ -77,4 +182,10 @@ class Settings(ConfigBase):
     db: DatabaseSettings = Field(default_factory=DatabaseSettings)
     redis: RedisSettings = Field(default_factory=RedisSettings)
     api: APISettings = Field(default_factory=APISettings)
+    sync: SyncSettings = Field(default_factory=SyncSettings)
+    notify: NotificationSettings = Field(default_factory=NotificationSettings)
+    worker: WorkerSettings = Field(default_factory=WorkerSettings)
+    search: SearchSettings = Field(default_factory=SearchSettings)
+    calendar: CalendarSettings = Field(default_factory=CalendarSettings)
+    metrics: MetricsSettings = Field(default_factory=MetricsSettings)
     app: AppSettings = Field(default_factory=AppSettings)
@@ -0,0 +1,61 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from core import metrics
+from core.config import DatabaseSettings
+
+DB_QUERY_SECONDS = metrics.histogram(
+    "db_query_duration_seconds", "Database statements by operation", ("operation",)
+)
+OPERATIONS = frozenset(
+    {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "CREATE", "TRUNCATE", "ANALYZE"}
+)
+
+
+def create_engine(settings: DatabaseSettings, **kwargs) -> AsyncEngine:
+    """Create async engine for the application database."""
+    engine = create_async_engine(settings.dsn, pool_pre_ping=True, **kwargs)
+    instrument_engine(engine)
+    return engine
+
+
+def create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """Create session factory bound to engine."""
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+def statement_operation(statement: str) -> str:
+    words = statement.split(None, 1)
+    operation = words[0].upper() if words else ""
+    return operation if operation in OPERATIONS else "OTHER"
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement executed through the engine."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+        started = conn.info["query_started"].pop()
+        DB_QUERY_SECONDS.observe(
+            time.perf_counter() - started, operation=statement_operation(statement)
+        )
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            DB_QUERY_SECONDS.observe(
+                time.perf_counter() - started.pop(),
+                operation=statement_operation(context.statement or ""),
+            )
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+RENEW_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderLock:
+    """
+    Leader election through a Redis key with a lifetime.
+
+    The holder renews the key every third of ``ttl``. If it dies or loses
+    Redis, the key expires and another instance takes over within ``ttl``
+    seconds.
+    """
+
+    def __init__(self, redis: Redis, name: str, ttl: float = 30.0):
+        self.redis = redis
+        self.name = name
+        self.ttl = ttl
+        self.token = uuid.uuid4().hex
+
+    @property
+    def _ttl_ms(self) -> int:
+        return int(self.ttl * 1000)
+
+    async def acquire(self) -> bool:
+        return bool(await self.redis.set(self.name, self.token, nx=True, px=self._ttl_ms))
+
+    async def renew(self) -> bool:
+        return bool(await self.redis.eval(RENEW_SCRIPT, 1, self.name, self.token, self._ttl_ms))
+
+    async def release(self) -> None:
+        try:
+            await self.redis.eval(RELEASE_SCRIPT, 1, self.name, self.token)
+        except RedisError as e:
+            logger.warning("Failed to release leader lock %s: %s", self.name, str(e))
+
+    async def run(self, job: Callable[[], Awaitable[None]]) -> None:
+        """
+        Run ``job`` whenever this instance is the leader, until cancelled.
+
+        The job is cancelled as soon as leadership is lost and started again
+        once it is regained.
+        """
+        while True:
+            try:
+                acquired = await self.acquire()
+            except RedisError as e:
+                logger.warning("Failed to acquire leader lock %s: %s", self.name, str(e))
+                acquired = False
+
+            if not acquired:
+                await asyncio.sleep(self.ttl / 3)
+                continue
+
+            logger.info("Became leader for %s", self.name)
+            task = asyncio.create_task(job())
+            try:
+                await self._hold(task)
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                await self.release()
+            logger.info("Lost leadership for %s", self.name)
+
+    async def _hold(self, task: asyncio.Task) -> None:
+        """Renew the lock while ``task`` runs."""
+        while not task.done():
+            await asyncio.wait({task}, timeout=self.ttl / 3)
+            if task.done():
+                break
+            try:
+                if not await self.renew():
+                    return
+            except RedisError as e:
+                logger.warning("Failed to renew leader lock %s: %s", self.name, str(e))
+                return
+
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Leader job failed", exc_info=task.exception())
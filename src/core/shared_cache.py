@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import math
+import random
+import struct
+import time
+import uuid
+import zlib
+from collections.abc import Awaitable, Callable, Iterable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.config import RedisSettings
+from core.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+# flags, compute time in seconds, logical expiry as unix time
+HEADER = struct.Struct("!Bdd")
+FLAG_COMPRESSED = 1
+
+UNLOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SharedCache:
+    """
+    Redis cache shared by all bot instances.
+
+    Values are bytes, zlib-compressed above ``compress_threshold``. Each entry
+    stores how long it took to compute, and ``get_or_compute`` refreshes hot
+    keys early with probability growing towards expiry (XFetch), so entries
+    rarely expire under load. Misses are recomputed by a single instance
+    holding a short Redis lock while the others wait for its result.
+    Redis errors are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        namespace: str = "szgmu",
+        compress_threshold: int = 1024,
+        beta: float = 1.0,
+        lock_timeout: float = 10.0,
+        poll_interval: float = 0.05,
+    ):
+        self.redis = redis
+        self.namespace = namespace
+        self.compress_threshold = compress_threshold
+        self.beta = beta
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+
+    @classmethod
+    def from_settings(cls, settings: RedisSettings, **kwargs) -> "SharedCache":
+        return cls(Redis.from_url(settings.dsn), **kwargs)
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _pack(self, value: bytes, delta: float, ttl: float) -> bytes:
+        flags = 0
+        if len(value) > self.compress_threshold:
+            value = zlib.compress(value)
+            flags |= FLAG_COMPRESSED
+        return HEADER.pack(flags, delta, time.time() + ttl) + value
+
+    @staticmethod
+    def _unpack(entry: bytes) -> tuple[bytes, float, float]:
+        flags, delta, expires_at = HEADER.unpack_from(entry)
+        value = entry[HEADER.size :]
+        if flags & FLAG_COMPRESSED:
+            value = zlib.decompress(value)
+        return value, delta, expires_at
+
+    def _should_refresh(self, delta: float, expires_at: float) -> bool:
+        # XFetch: -log(U) is exponential, so early refreshes become likelier near expiry
+        return time.time() - delta * self.beta * math.log(1.0 - random.random()) >= expires_at  # noqa: S311
+
+    async def _get_entry(self, key: str) -> tuple[bytes, float, float] | None:
+        try:
+            entry = await self.redis.get(self._key(key))
+        except RedisError as e:
+            logger.warning("Shared cache get failed for %s: %s", key, str(e))
+            return None
+        record_cache_lookup("shared", hit=entry is not None)
+        return self._unpack(entry) if entry is not None else None
+
+    async def get(self, key: str) -> bytes | None:
+        entry = await self._get_entry(key)
+        return entry[0] if entry is not None else None
+
+    async def get_many(self, keys: Iterable[str]) -> list[bytes | None]:
+        keys = list(keys)
+        if not keys:
+            return []
+        try:
+            entries = await self.redis.mget([self._key(key) for key in keys])
+        except RedisError as e:
+            logger.warning("Shared cache mget failed: %s", str(e))
+            return [None] * len(keys)
+        for entry in entries:
+            record_cache_lookup("shared", hit=entry is not None)
+        return [self._unpack(entry)[0] if entry is not None else None for entry in entries]
+
+    async def set(self, key: str, value: bytes, ttl: float, delta: float = 0.0) -> None:
+        try:
+            await self.redis.set(self._key(key), self._pack(value, delta, ttl), px=int(ttl * 1000))
+        except RedisError as e:
+            logger.warning("Shared cache set failed for %s: %s", key, str(e))
+
+    async def set_many(self, items: dict[str, bytes], ttl: float) -> None:
+        if not items:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(self._key(key), self._pack(value, 0.0, ttl), px=int(ttl * 1000))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Shared cache set_many failed: %s", str(e))
+
+    async def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            await self.redis.unlink(*(self._key(key) for key in keys))
+        except RedisError as e:
+            logger.warning("Shared cache delete failed: %s", str(e))
+
+    async def version(self, key: str) -> int | None:
+        """Value of a counter bumped by ``bump``, 0 if never bumped, None if unknown."""
+        try:
+            value = await self.redis.get(self._key(key))
+        except RedisError as e:
+            logger.warning("Shared cache version read failed for %s: %s", key, str(e))
+            return None
+        return int(value) if value is not None else 0
+
+    async def bump(self, key: str) -> None:
+        try:
+            await self.redis.incr(self._key(key))
+        except RedisError as e:
+            logger.warning("Shared cache bump failed for %s: %s", key, str(e))
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[bytes | None]],
+        ttl: float,
+    ) -> bytes | None:
+        """
+        Return cached value or compute and store it.
+
+        ``compute`` returning None is passed through and not cached.
+        """
+        entry = await self._get_entry(key)
+        if entry is not None:
+            value, delta, expires_at = entry
+            if not self._should_refresh(delta, expires_at):
+                return value
+            # Early refresh by whoever gets the lock, the rest keep serving the value
+            token = await self._lock(key)
+            if token is None:
+                return value
+            try:
+                return await self._compute_and_set(key, compute, ttl)
+            finally:
+                await self._unlock(key, token)
+
+        token = await self._lock(key)
+        if token is None:
+            value = await self._wait_for(key)
+            if value is not None:
+                return value
+            return await self._compute_and_set(key, compute, ttl)
+
+        try:
+            return await self._compute_and_set(key, compute, ttl)
+        finally:
+            await self._unlock(key, token)
+
+    async def _compute_and_set(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[bytes | None]],
+        ttl: float,
+    ) -> bytes | None:
+        started = time.monotonic()
+        value = await compute()
+        if value is not None:
+            await self.set(key, value, ttl, delta=time.monotonic() - started)
+        return value
+
+    async def _lock(self, key: str) -> str | None:
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.redis.set(
+                self._key(f"lock:{key}"), token, nx=True, px=int(self.lock_timeout * 1000)
+            )
+        except RedisError as e:
+            logger.warning("Shared cache lock failed for %s: %s", key, str(e))
+            # Without Redis every instance computes on its own
+            return token
+        return token if acquired else None
+
+    async def _unlock(self, key: str, token: str) -> None:
+        try:
+            await self.redis.eval(UNLOCK_SCRIPT, 1, self._key(f"lock:{key}"), token)
+        except RedisError as e:
+            logger.warning("Shared cache unlock failed for %s: %s", key, str(e))
+
+    async def _wait_for(self, key: str) -> bytes | None:
+        """Wait for the lock holder to store the value, up to the lock timeout."""
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                entry = await self.redis.get(self._key(key))
+                if entry is not None:
+                    return self._unpack(entry)[0]
+                if not await self.redis.exists(self._key(f"lock:{key}")):
+                    return None
+            except RedisError:
+                return None
+        return None
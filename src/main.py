@@ -1,24 +1,221 @@
 import asyncio
 import logging
+import multiprocessing
 import sys
 
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.redis import RedisStorage
 
-def setup_logging() -> None:
+from api.client import ScheduleAPIClient
+from api.transport import TransportOptions
+from bot.middlewares import setup_metrics
+from bot.sharding import ShardConsumer, UpdateRouter, shard_queue
+from core.config import Settings
+from core.database import create_engine, create_session_factory
+from core.leader import LeaderLock
+from core.metrics import MetricsServer
+from core.shared_cache import SharedCache
+from services.calendar import CalendarFeeds, CalendarServer
+from services.navigation import NavigationIndex
+from services.notifications import NotificationScheduler
+from services.occupancy import OccupancyIndex
+from services.search import PgTrigramSearch
+from services.sync import ScheduleSync
+
+logger = logging.getLogger(__name__)
+
+LEADER_LOCK = "szgmu:leader"
+
+
+def setup_logging(level: str = "INFO") -> None:
     logging.basicConfig(
-        level=logging.INFO,
+        level=level,
         format="%(filename)s:%(lineno)d #%(levelname)-8s [%(asctime)s] - %(name)s - %(message)s",
     )
-    logger = logging.getLogger(__name__)
-    logger.info("Starting bot")
 
 
-async def main() -> None:
-    setup_logging()
+def create_storage(settings: Settings) -> BaseStorage:
+    """FSM storage, shared between workers in Redis."""
+    if settings.bot.use_redis:
+        return RedisStorage.from_url(settings.redis.dsn)
+    return MemoryStorage()
 
 
-if __name__ == "__main__":
+async def main(shard: int = 0) -> None:
+    settings = Settings()
+    setup_logging(settings.app.log_level)
+    logger.info("Starting bot, shard %d of %d", shard, settings.worker.count)
+
+    bot = Bot(token=settings.bot.token.get_secret_value())
+    dispatcher = Dispatcher(storage=create_storage(settings))
+    engine = create_engine(settings.db)
+    session_factory = create_session_factory(engine)
+    shared_cache = SharedCache.from_settings(settings.redis) if settings.bot.use_redis else None
+
+    client = ScheduleAPIClient(
+        base_url=str(settings.api.schedule_url),
+        timeout=settings.api.timeout_seconds,
+        max_retries=settings.api.max_retries,
+        cache_ttl=settings.app.cache_ttl_seconds,
+        shared_cache=shared_cache,
+        retry_budget=settings.api.retry_budget_seconds,
+        rate_limit=settings.api.rate_limit,
+        breaker_threshold=settings.api.breaker_threshold,
+        breaker_reset_timeout=settings.api.breaker_reset_seconds,
+        transport=TransportOptions(
+            limit=settings.api.pool_limit,
+            limit_per_host=settings.api.pool_limit_per_host,
+            keepalive_timeout=settings.api.keepalive_seconds,
+            dns_cache_ttl=settings.api.dns_cache_seconds,
+            connect_timeout=settings.api.connect_timeout_seconds,
+            read_timeout=settings.api.read_timeout_seconds,
+            compression=settings.api.compression,
+        ),
+    )
+    scheduler = NotificationScheduler(
+        bot,
+        session_factory,
+        settings.notify,
+        shared_cache=shared_cache,
+        cache_ttl=settings.app.cache_ttl_seconds,
+    )
+    navigation = NavigationIndex(
+        session_factory,
+        redis=shared_cache.redis if shared_cache is not None else None,
+        poll_interval=settings.worker.navigation_poll_seconds,
+        with_search=settings.search.backend == "memory",
+        min_score=settings.search.min_score,
+    )
+    occupancy = OccupancyIndex(session_factory)
+    navigation.add_listener(occupancy.invalidate)
+    if settings.search.backend == "pg_trgm":
+        search = PgTrigramSearch(session_factory, settings.search.min_score)
+    else:
+        search = navigation
+    sync = ScheduleSync(client, session_factory, settings.sync)
+    sync.add_listener(scheduler.invalidate)
+    if settings.notify.changes_enabled:
+        sync.add_listener(scheduler.notify_changes)
+    calendars = CalendarFeeds(
+        session_factory,
+        timezone=settings.calendar.timezone,
+        shared_cache=shared_cache,
+        cache_ttl=settings.calendar.cache_ttl_seconds,
+        max_cached_bytes=settings.calendar.max_cached_bytes,
+    )
+    # Shared feeds are dropped before followers hear about the rebuild
+    sync.add_listener(calendars.invalidate)
+    sync.add_listener(navigation.on_sync)
+    if shared_cache is not None:
+        # Other workers only see the rebuild, not which subgroups changed
+        navigation.add_listener(calendars.on_rebuild)
+    dispatcher["scheduler"] = scheduler
+    dispatcher["navigation"] = navigation
+    dispatcher["search"] = search
+    dispatcher["occupancy"] = occupancy
+
+    metrics_server = None
+    if settings.metrics.enabled:
+        setup_metrics(dispatcher)
+        client.export_metrics()
+        metrics_server = MetricsServer(settings.metrics.host, settings.metrics.port + shard)
+        await metrics_server.start()
+
+    calendar_server = None
+    if settings.calendar.enabled:
+        calendar_server = CalendarServer(
+            calendars,
+            navigation,
+            settings.calendar.host,
+            settings.calendar.port + shard,
+            max_age=settings.calendar.max_age_seconds,
+        )
+        await calendar_server.start()
+
+    async def run_jobs() -> None:
+        jobs = [sync.run_forever(), scheduler.run_forever()]
+        if settings.worker.count > 1:
+            router = UpdateRouter(bot, shared_cache.redis, settings.worker.count)
+            jobs.append(router.run())
+        await asyncio.gather(*jobs)
+
+    try:
+        async with client:
+            if shared_cache is None:
+                jobs = asyncio.create_task(run_jobs())
+            else:
+                # Sync, notifications and update routing run on a single instance
+                leader = LeaderLock(
+                    shared_cache.redis, LEADER_LOCK, settings.worker.leader_ttl_seconds
+                )
+                jobs = asyncio.create_task(leader.run(run_jobs))
+            # Every worker keeps its own copy of the tree
+            navigation_task = asyncio.create_task(navigation.run())
+
+            try:
+                if settings.worker.count == 1:
+                    await dispatcher.start_polling(bot, close_bot_session=False)
+                else:
+                    consumer = ShardConsumer(
+                        bot,
+                        dispatcher,
+                        shared_cache.redis,
+                        shard_queue(shard),
+                        settings.worker.max_pending_updates,
+                    )
+                    await dispatcher.emit_startup(bot=bot, dispatcher=dispatcher)
+                    try:
+                        await consumer.run()
+                    finally:
+                        await dispatcher.emit_shutdown(bot=bot, dispatcher=dispatcher)
+            finally:
+                jobs.cancel()
+                navigation_task.cancel()
+                await asyncio.gather(jobs, navigation_task, return_exceptions=True)
+    finally:
+        if metrics_server is not None:
+            await metrics_server.stop()
+        if calendar_server is not None:
+            await calendar_server.stop()
+        await dispatcher.storage.close()
+        if shared_cache is not None:
+            await shared_cache.close()
+        await engine.dispose()
+        await bot.session.close()
+
+
+def run_worker(shard: int = 0) -> None:
     # Fix for Windows + psycopg async
     if sys.platform == "win32":
-        asyncio.run(main(), loop_factory=asyncio.SelectorEventLoop)
+        asyncio.run(main(shard), loop_factory=asyncio.SelectorEventLoop)
+    else:
+        asyncio.run(main(shard))
+
+
+def spawn_workers(count: int) -> None:
+    """Run every shard in its own process."""
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_worker, args=(shard,), name=f"worker-{shard}")
+        for shard in range(count)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    settings = Settings()
+    worker = settings.worker
+    if worker.count > 1 and not settings.bot.use_redis:
+        sys.exit("WORKER_COUNT > 1 requires BOT_USE_REDIS=true")
+    if worker.index is not None and worker.index >= worker.count:
+        sys.exit("WORKER_INDEX must be less than WORKER_COUNT")
+
+    if worker.count > 1 and worker.index is None:
+        spawn_workers(worker.count)
     else:
-        asyncio.run(main())
+        run_worker(worker.index or 0)
@@ -27,7 +27,23 @@ class Lesson(Base):
     address: Mapped[str | None] = mapped_column(String(255))
     room: Mapped[str | None] = mapped_column(String(100))
 
+    # Upstream schedule that last wrote the lesson, see services.lesson_writer
+    schedule_id: Mapped[int | None] = mapped_column(BigInteger)
+
     __table_args__ = (
-        Index("idx_lessons_lookup", "subgroup_id", "date"),
-        UniqueConstraint("subgroup_id", "date", "start_time", "subject", name="uq_lesson_unique"),
+        # Covers day and week lookups, see services.lessons
+        UniqueConstraint(
+            "subgroup_id",
+            "date",
+            "start_time",
+            "subject",
+            name="uq_lesson_unique",
+            postgresql_include=["end_time", "lesson_type", "teacher", "address", "room"],
+        ),
+        # Day-wide reads across subgroups, see services.occupancy
+        Index(
+            "idx_lessons_date",
+            "date",
+            postgresql_include=["start_time", "end_time", "subject", "teacher", "address", "room"],
+        ),
     )
@@ -0,0 +1,26 @@
+import datetime
+
+from sqlalchemy import BigInteger, DateTime, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class ScheduleSyncState(Base):
+    """Sync watermark of a single upstream schedule."""
+
+    __tablename__ = "schedule_sync_state"
+
+    schedule_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+
+    summary_hash: Mapped[str] = mapped_column(String(64))
+    content_hash: Mapped[str | None] = mapped_column(String(64))
+    update_time: Mapped[datetime.datetime | None] = mapped_column()
+
+    checked_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True))
+    synced_at: Mapped[datetime.datetime | None] = mapped_column(DateTime(timezone=True))
+
+    # Lesson scopes last written from this schedule, as
+    # [subgroup_id, lesson_type name, date_from, date_to] lists
+    scopes: Mapped[list[list] | None] = mapped_column(JSONB)
@@ -0,0 +1,373 @@
+import asyncio
+import datetime
+import hashlib
+import logging
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass
+from zoneinfo import ZoneInfo
+
+from aiohttp import web
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.metrics import record_cache_lookup
+from core.shared_cache import SharedCache
+from services.digest import LESSON_TYPE_NAMES
+from services.lessons import ScheduledLesson, range_statement
+from services.navigation import NavigationIndex
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/calendar; charset=utf-8"
+PRODUCT_ID = "-//szgmu-schedule-bot//RU"
+# RFC 5545 limit, in octets, excluding the line break
+MAX_LINE_OCTETS = 75
+FETCH_SIZE = 500
+# Bumped on every invalidation, so instances can tell feeds read before it
+SHARED_VERSION_KEY = "calendar:version"
+
+
+def escape_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Split a content line into 75-octet pieces without breaking UTF-8 characters."""
+    if len(line.encode()) <= MAX_LINE_OCTETS:
+        return line + "\r\n"
+    pieces = []
+    piece: list[str] = []
+    size = 0
+    for char in line:
+        octets = len(char.encode())
+        # Continuation lines start with a space that counts towards the limit
+        if size + octets > MAX_LINE_OCTETS - (1 if pieces else 0):
+            pieces.append("".join(piece))
+            piece, size = [], 0
+        piece.append(char)
+        size += octets
+    pieces.append("".join(piece))
+    return "\r\n ".join(pieces) + "\r\n"
+
+
+def _utc(date: datetime.date, time: datetime.time, timezone: ZoneInfo) -> str:
+    moment = datetime.datetime.combine(date, time, timezone).astimezone(datetime.UTC)
+    return f"{moment:%Y%m%dT%H%M%SZ}"
+
+
+def render_event(lesson: ScheduledLesson, timezone: ZoneInfo, stamp: str) -> str:
+    """One ``VEVENT``, with a UID stable across regenerations."""
+    key = f"{lesson.subgroup_id}|{lesson.date}|{lesson.start_time}|{lesson.subject}"
+    uid = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@szgmu-schedule-bot",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{_utc(lesson.date, lesson.start_time, timezone)}",
+        f"DTEND:{_utc(lesson.date, lesson.end_time, timezone)}",
+        "SUMMARY:" + escape_text(f"{lesson.subject} ({LESSON_TYPE_NAMES[lesson.lesson_type]})"),
+    ]
+    place = ", ".join(part for part in (lesson.room, lesson.address) if part)
+    if place:
+        lines.append(f"LOCATION:{escape_text(place)}")
+    if lesson.teacher:
+        lines.append(f"DESCRIPTION:{escape_text(lesson.teacher)}")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
+
+
+def render_header(name: str) -> str:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODUCT_ID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+    ]
+    return "".join(fold(line) for line in lines)
+
+
+def render_footer() -> str:
+    return "END:VCALENDAR\r\n"
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an ``If-None-Match`` list names ``etag``, by the weak comparison it calls for."""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
+
+
+@dataclass(frozen=True, slots=True)
+class Feed:
+    """
+    Rendered calendar of a subgroup and its entity tag.
+
+    The tag is weak and derived from the name and lesson rows, not the body,
+    whose ``DTSTAMP`` is the generation time: regenerating unchanged lessons
+    keeps the tag, so clients still get 304.
+    """
+
+    body: bytes
+    etag: str
+
+    def pack(self) -> bytes:
+        return self.etag.encode() + b"\n" + self.body
+
+    @classmethod
+    def unpack(cls, value: bytes) -> "Feed":
+        etag, _, body = value.partition(b"\n")
+        return cls(body, etag.decode())
+
+
+class CalendarFeeds:
+    """
+    iCalendar feeds of subgroups, cached until the sync changes them.
+
+    A feed is generated by streaming the subgroup's lessons from the
+    database in batches of ``FETCH_SIZE`` and writing events as they
+    arrive. The result is then kept with an ETag derived from its content,
+    in an in-process LRU bounded by ``max_cached_bytes`` and, with a
+    ``SharedCache``, in Redis for other instances. Concurrent misses for
+    one subgroup wait for the first generation instead of querying again.
+    A feed is only kept if no invalidation happened while it was read,
+    on any instance with a ``SharedCache``, since followers learn of a
+    sync only at their next navigation poll.
+    ``invalidate`` is a sync listener dropping feeds of changed subgroups.
+    Instances that only follow the sync learn of it from the navigation
+    rebuild, which doesn't say what changed, so ``on_rebuild`` drops their
+    local copies; feeds still in Redis are fetched again from there.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        timezone: str = "Europe/Moscow",
+        shared_cache: SharedCache | None = None,
+        cache_ttl: float = 86400.0,
+        max_cached_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.session_factory = session_factory
+        self.timezone = ZoneInfo(timezone)
+        self.shared_cache = shared_cache
+        self.cache_ttl = cache_ttl
+        self.max_cached_bytes = max_cached_bytes
+        self._feeds: OrderedDict[int, Feed] = OrderedDict()
+        self._cached_bytes = 0
+        self._generating: dict[int, asyncio.Event] = {}
+        self._version = 0
+        # Set by ``invalidate`` so the rebuild of the same sync keeps other feeds
+        self._invalidated = False
+
+    @staticmethod
+    def _shared_key(subgroup_id: int) -> str:
+        return f"calendar:{subgroup_id}"
+
+    def _remember(self, subgroup_id: int, feed: Feed) -> None:
+        self._forget(subgroup_id)
+        if len(feed.body) > self.max_cached_bytes:
+            return
+        self._feeds[subgroup_id] = feed
+        self._cached_bytes += len(feed.body)
+        while self._cached_bytes > self.max_cached_bytes:
+            _, evicted = self._feeds.popitem(last=False)
+            self._cached_bytes -= len(evicted.body)
+
+    def _forget(self, subgroup_id: int) -> None:
+        feed = self._feeds.pop(subgroup_id, None)
+        if feed is not None:
+            self._cached_bytes -= len(feed.body)
+
+    async def cached(self, subgroup_id: int) -> Feed | None:
+        """Cached feed, waiting for a generation already in progress."""
+        event = self._generating.get(subgroup_id)
+        if event is not None:
+            await event.wait()
+
+        feed = self._feeds.get(subgroup_id)
+        record_cache_lookup("calendar", hit=feed is not None)
+        if feed is not None:
+            self._feeds.move_to_end(subgroup_id)
+            return feed
+        if self.shared_cache is not None:
+            value = await self.shared_cache.get(self._shared_key(subgroup_id))
+            if value is not None:
+                feed = Feed.unpack(value)
+                self._remember(subgroup_id, feed)
+                return feed
+        return None
+
+    async def generate(self, subgroup_id: int, name: str) -> AsyncIterator[bytes]:
+        """Stream a fresh feed in chunks and cache it once complete."""
+        while (running := self._generating.get(subgroup_id)) is not None:
+            await running.wait()
+            feed = self._feeds.get(subgroup_id)
+            if feed is not None:
+                yield feed.body
+                return
+        event = self._generating[subgroup_id] = asyncio.Event()
+        version = self._version
+        chunks: list[bytes] = []
+        tag = hashlib.sha256(f"{name}\0{self.timezone.key}".encode())
+        complete = False
+        try:
+            shared_version = None
+            if self.shared_cache is not None:
+                shared_version = await self.shared_cache.version(SHARED_VERSION_KEY)
+            chunk = render_header(name).encode()
+            chunks.append(chunk)
+            yield chunk
+
+            stamp = f"{datetime.datetime.now(datetime.UTC):%Y%m%dT%H%M%SZ}"
+            statement = range_statement(subgroup_id, datetime.date.min, datetime.date.max)
+            async with self.session_factory() as session:
+                result = await session.stream(statement.execution_options(yield_per=FETCH_SIZE))
+                async for rows in result.partitions():
+                    for row in rows:
+                        tag.update(repr(tuple(row)).encode())
+                    chunk = "".join(
+                        render_event(ScheduledLesson(*row), self.timezone, stamp) for row in rows
+                    ).encode()
+                    chunks.append(chunk)
+                    yield chunk
+
+            chunk = render_footer().encode()
+            chunks.append(chunk)
+            yield chunk
+            complete = True
+        finally:
+            if complete:
+                feed = Feed(b"".join(chunks), f'W/"{tag.hexdigest()[:32]}"')
+                await self._keep(subgroup_id, feed, version, shared_version)
+            if self._generating.get(subgroup_id) is event:
+                del self._generating[subgroup_id]
+            event.set()
+
+    async def _keep(
+        self,
+        subgroup_id: int,
+        feed: Feed,
+        version: int,
+        shared_version: int | None,
+    ) -> None:
+        """Cache a generated feed unless lessons changed since they were read."""
+        if version != self._version:
+            return
+        if self.shared_cache is None:
+            self._remember(subgroup_id, feed)
+            return
+        if (
+            shared_version is None
+            or await self.shared_cache.version(SHARED_VERSION_KEY) != shared_version
+        ):
+            return
+        self._remember(subgroup_id, feed)
+        key = self._shared_key(subgroup_id)
+        await self.shared_cache.set(key, feed.pack(), self.cache_ttl)
+        # An invalidation during the write may have deleted the key before it was set
+        if await self.shared_cache.version(SHARED_VERSION_KEY) != shared_version:
+            self._forget(subgroup_id)
+            await self.shared_cache.delete(key)
+
+    async def invalidate(self, subgroup_ids: Iterable[int]) -> None:
+        """Drop feeds of subgroups whose lessons changed."""
+        subgroup_ids = set(subgroup_ids)
+        self._version += 1
+        self._invalidated = True
+        for subgroup_id in subgroup_ids:
+            self._forget(subgroup_id)
+        if self.shared_cache is not None:
+            # Bumped first, so a generation writing after the delete sees it
+            await self.shared_cache.bump(SHARED_VERSION_KEY)
+            await self.shared_cache.delete(*map(self._shared_key, subgroup_ids))
+
+    def on_rebuild(self) -> None:
+        """Navigation listener: drop local feeds unless this instance ran the sync."""
+        if self._invalidated:
+            self._invalidated = False
+            return
+        self._version += 1
+        self._feeds.clear()
+        self._cached_bytes = 0
+
+
+class CalendarServer:
+    """
+    HTTP server of subgroup feeds at ``/calendar/{subgroup_id}.ics``.
+
+    Cached feeds are answered with their ETag, and with 304 when the client
+    already has it. Subgroups unknown to the navigation tree get 404 without
+    touching the database.
+    """
+
+    def __init__(
+        self,
+        feeds: CalendarFeeds,
+        navigation: NavigationIndex,
+        host: str,
+        port: int,
+        max_age: int = 300,
+    ):
+        self.feeds = feeds
+        self.navigation = navigation
+        self.host = host
+        self.port = port
+        self.max_age = max_age
+        self._runner: web.AppRunner | None = None
+
+    def _name(self, subgroup_id: int) -> str | None:
+        subgroup = self.navigation.tree.subgroup(subgroup_id)
+        if subgroup is None:
+            return None
+        group = self.navigation.tree.group(subgroup.group_id)
+        return f"{group.name}, {subgroup.name}" if group is not None else subgroup.name
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        try:
+            subgroup_id = int(request.match_info["subgroup_id"])
+        except ValueError:
+            raise web.HTTPNotFound() from None
+        if not self.navigation.loaded:
+            raise web.HTTPServiceUnavailable(headers={"Retry-After": "5"})
+        name = self._name(subgroup_id)
+        if name is None:
+            raise web.HTTPNotFound()
+
+        headers = {"Cache-Control": f"max-age={self.max_age}"}
+        feed = await self.feeds.cached(subgroup_id)
+        if feed is not None:
+            headers["ETag"] = feed.etag
+            if etag_matches(request.headers.get("If-None-Match", ""), feed.etag):
+                raise web.HTTPNotModified(headers=headers)
+            headers["Content-Type"] = CONTENT_TYPE
+            return web.Response(body=feed.body, headers=headers)
+
+        # The ETag is only known once the feed is complete, clients get it next time
+        response = web.StreamResponse(headers={**headers, "Content-Type": CONTENT_TYPE})
+        await response.prepare(request)
+        async for chunk in self.feeds.generate(subgroup_id, name):
+            await response.write(chunk)
+        await response.write_eof()
+        return response
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/calendar/{subgroup_id}.ics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info("Serving calendars on %s:%d", self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,135 @@
+import datetime
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from core.metrics import record_cache_lookup
+from models.enums import LessonType, WeekDayShort
+from services.lessons import ScheduledLesson
+
+if TYPE_CHECKING:
+    from services.lesson_writer import LessonRecord
+    from services.schedule_diff import SubgroupChanges
+
+LESSON_TYPE_NAMES = {
+    LessonType.LECTURE: "лекция",
+    LessonType.SEMINAR: "семинар",
+}
+WEEKDAYS = list(WeekDayShort)
+# Telegram allows 4096 characters per message
+MAX_CHANGE_LINES = 30
+CHANGED_FIELDS = (
+    ("end_time", "конец"),
+    ("lesson_type", "тип"),
+    ("teacher", "преподаватель"),
+    ("room", "аудитория"),
+    ("address", "адрес"),
+)
+
+
+def render_day(date: datetime.date, lessons: Sequence[ScheduledLesson]) -> str:
+    """Render lessons of a single day as a message text."""
+    title = f"Расписание на {date:%d.%m} ({WEEKDAYS[date.weekday()]})"
+    if not lessons:
+        return f"{title}\n\nЗанятий нет"
+
+    lines = [title]
+    for lesson in lessons:
+        lines.append("")
+        lines.append(
+            f"{lesson.start_time:%H:%M}–{lesson.end_time:%H:%M} {lesson.subject}"
+            f" ({LESSON_TYPE_NAMES[lesson.lesson_type]})"
+        )
+        place = ", ".join(part for part in (lesson.room, lesson.address) if part)
+        if place:
+            lines.append(f"📍 {place}")
+        if lesson.teacher:
+            lines.append(f"👤 {lesson.teacher}")
+    return "\n".join(lines)
+
+
+def _lesson_line(lesson: "LessonRecord") -> str:
+    line = (
+        f"{lesson.date:%d.%m} ({WEEKDAYS[lesson.date.weekday()]}) "
+        f"{lesson.start_time:%H:%M}–{lesson.end_time:%H:%M} {lesson.subject}"
+    )
+    place = ", ".join(part for part in (lesson.room, lesson.address) if part)
+    return f"{line}, {place}" if place else line
+
+
+def _field_value(lesson: "LessonRecord", name: str) -> str:
+    value = getattr(lesson, name)
+    if value is None:
+        return "—"
+    if name == "lesson_type":
+        return LESSON_TYPE_NAMES[value]
+    if name == "end_time":
+        return f"{value:%H:%M}"
+    return value
+
+
+def render_changes(changes: "SubgroupChanges") -> str:
+    """Render added, removed and modified lessons as a message text."""
+    entries = [(lesson, f"➕ {_lesson_line(lesson)}") for lesson in changes.added]
+    entries.extend((lesson, f"❌ {_lesson_line(lesson)}") for lesson in changes.removed)
+    for before, after in changes.modified:
+        differences = ", ".join(
+            f"{title}: {_field_value(before, name)} → {_field_value(after, name)}"
+            for name, title in CHANGED_FIELDS
+            if getattr(before, name) != getattr(after, name)
+        )
+        entries.append((after, f"✏️ {_lesson_line(after)}\n    {differences}"))
+    entries.sort(key=lambda entry: (entry[0].date, entry[0].start_time, entry[0].subject))
+
+    lines = ["Изменения в расписании", ""]
+    lines.extend(line for _, line in entries[:MAX_CHANGE_LINES])
+    if len(entries) > MAX_CHANGE_LINES:
+        lines.append(f"…и ещё {len(entries) - MAX_CHANGE_LINES}")
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True, slots=True)
+class Digest:
+    """Rendered digest message, shared by all members of a subgroup."""
+
+    text: str
+
+
+class DigestCache:
+    """
+    LRU cache of rendered digests keyed by subgroup and date.
+
+    Entries of a subgroup are dropped with ``invalidate`` when the sync
+    changes its lessons. ``version`` counts invalidations, so a digest
+    rendered from lessons read before one can be told apart and not kept.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.version = 0
+        self._entries: OrderedDict[tuple[int, datetime.date], Digest] = OrderedDict()
+
+    def get(self, subgroup_id: int, date: datetime.date) -> Digest | None:
+        key = (subgroup_id, date)
+        digest = self._entries.get(key)
+        if digest is not None:
+            self._entries.move_to_end(key)
+        record_cache_lookup("digest", hit=digest is not None)
+        return digest
+
+    def set(self, subgroup_id: int, date: datetime.date, digest: Digest) -> None:
+        key = (subgroup_id, date)
+        self._entries[key] = digest
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, subgroup_ids: Iterable[int]) -> None:
+        subgroup_ids = set(subgroup_ids)
+        self.version += 1
+        for key in [key for key in self._entries if key[0] in subgroup_ids]:
+            del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
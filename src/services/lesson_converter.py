@@ -0,0 +1,170 @@
+import datetime
+import re
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+
+from api.schemas.responses import ScheduleLesson
+from core.config import SyncSettings
+from models.enums import LessonType, WeekDayShort
+from services.lesson_writer import LessonRecord, LessonScope
+
+PAIR_TIME_RE = re.compile(r"(\d{1,2})[:.](\d{2})\s*[-–—]\s*(\d{1,2})[:.](\d{2})")
+WEEK_RANGE_RE = re.compile(r"(\d+)\s*(?:[-–—]\s*(\d+))?")
+YEAR_RE = re.compile(r"\d{4}")
+
+WEEKDAYS = {day: index for index, day in enumerate(WeekDayShort)}
+WEEKDAY_NAMES = {
+    "понедельник": WeekDayShort.MON,
+    "вторник": WeekDayShort.TUE,
+    "среда": WeekDayShort.WED,
+    "четверг": WeekDayShort.THU,
+    "пятница": WeekDayShort.FRI,
+    "суббота": WeekDayShort.SAT,
+    "воскресенье": WeekDayShort.SUN,
+}
+
+# Distinct values are few, so memo tables stay small
+MEMO_SIZE = 4096
+
+TimeRange = tuple[datetime.time, datetime.time]
+DateRange = tuple[datetime.date, datetime.date]
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def parse_pair_time(value: str) -> TimeRange | None:
+    """Parse ``09:00-10:30`` or ``9.00 - 10.30`` into start and end time."""
+    match = PAIR_TIME_RE.search(value)
+    if not match:
+        return None
+    start_hour, start_minute, end_hour, end_minute = (int(part) for part in match.groups())
+    return datetime.time(start_hour, start_minute), datetime.time(end_hour, end_minute)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def parse_weeks(value: str) -> tuple[int, ...]:
+    """Parse week lists and ranges such as ``1,3,5`` or ``1-8, 10``."""
+    weeks: set[int] = set()
+    for match in WEEK_RANGE_RE.finditer(value):
+        first = int(match.group(1))
+        last = int(match.group(2) or first)
+        weeks.update(range(first, last + 1))
+    return tuple(sorted(weeks))
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def parse_weekday(value: str) -> WeekDayShort | None:
+    """Parse short or full Russian day name."""
+    value = value.strip().lower()
+    value = WEEKDAY_NAMES.get(value, value)
+    return WeekDayShort(value) if value in WEEKDAYS else None
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def parse_lesson_type(value: str) -> LessonType:
+    """Map API lesson type (``лекционного``/``семинарского``) to LessonType."""
+    value = value.strip().lower()
+    if value.startswith("лек"):
+        return LessonType.LECTURE
+    return LessonType.SEMINAR
+
+
+class LessonConverter:
+    """
+    Converter from API lessons to dated ``LessonRecord`` rows.
+
+    Free-form ``pairTime``, ``dayName`` and ``weekNumber`` strings are parsed
+    once per distinct value, and lesson dates are memoized per semester,
+    weekday and week list, so a batch of lessons is expanded with lookups.
+    """
+
+    def __init__(self, settings: SyncSettings):
+        self.settings = settings
+        self._semesters: dict[tuple[str, str], DateRange | None] = {}
+        self._dates: dict[tuple[DateRange, WeekDayShort, str], tuple[datetime.date, ...]] = {}
+
+    def semester_bounds(self, academic_year: str, semester: str) -> DateRange | None:
+        """First and last day of semester, e.g. for ``2025/2026`` and ``весенний``."""
+        key = (academic_year, semester)
+        if key not in self._semesters:
+            self._semesters[key] = self._semester_bounds(academic_year, semester)
+        return self._semesters[key]
+
+    def _semester_bounds(self, academic_year: str, semester: str) -> DateRange | None:
+        years = YEAR_RE.findall(academic_year)
+        if not years:
+            return None
+
+        semester = semester.strip().lower()
+        is_autumn = semester.startswith("осен") or (semester.isdigit() and int(semester) % 2 == 1)
+        first_year = int(years[0])
+        year = first_year if is_autumn else int(years[1]) if len(years) > 1 else first_year + 1
+        month_day = (
+            self.settings.autumn_semester_start
+            if is_autumn
+            else self.settings.spring_semester_start
+        )
+        month, day = (int(part) for part in month_day.split("-"))
+
+        start = datetime.date(year, month, day)
+        end = start + datetime.timedelta(weeks=self.settings.semester_weeks, days=-1)
+        return start, end
+
+    def lesson_dates(self, lesson: ScheduleLesson) -> tuple[datetime.date, ...]:
+        """Concrete dates of the lesson within its semester."""
+        bounds = self.semester_bounds(lesson.academic_year, lesson.semester)
+        weekday = parse_weekday(lesson.day_name)
+        if bounds is None or weekday is None:
+            return ()
+
+        key = (bounds, weekday, lesson.week_number)
+        dates = self._dates.get(key)
+        if dates is None:
+            dates = self._dates[key] = self._expand(bounds, weekday, lesson.week_number)
+        return dates
+
+    @staticmethod
+    def _expand(
+        bounds: DateRange,
+        weekday: WeekDayShort,
+        week_number: str,
+    ) -> tuple[datetime.date, ...]:
+        start, end = bounds
+        first_day = start + datetime.timedelta(days=WEEKDAYS[weekday] - start.weekday())
+        dates = (
+            first_day + datetime.timedelta(weeks=week - 1) for week in parse_weeks(week_number)
+        )
+        return tuple(date for date in dates if start <= date <= end)
+
+    def scope(self, subgroup_id: int, lesson: ScheduleLesson) -> LessonScope | None:
+        """Range of lessons replaced by this lesson's schedule."""
+        bounds = self.semester_bounds(lesson.academic_year, lesson.semester)
+        if bounds is None:
+            return None
+        return LessonScope(subgroup_id, parse_lesson_type(lesson.lesson_type), *bounds)
+
+    def convert(
+        self,
+        lessons: Iterable[tuple[int, ScheduleLesson]],
+    ) -> Iterator[LessonRecord]:
+        """
+        Expand ``(subgroup_id, lesson)`` pairs into dated records.
+
+        Lessons with unparsable time, day or semester produce no records.
+        """
+        for subgroup_id, lesson in lessons:
+            times = parse_pair_time(lesson.pair_time)
+            if times is None:
+                continue
+            lesson_type = parse_lesson_type(lesson.lesson_type)
+            for date in self.lesson_dates(lesson):
+                yield LessonRecord(
+                    subgroup_id=subgroup_id,
+                    subject=lesson.subject_name,
+                    lesson_type=lesson_type,
+                    date=date,
+                    start_time=times[0],
+                    end_time=times[1],
+                    teacher=lesson.lector_name,
+                    address=lesson.location_address,
+                    room=lesson.auditory_number,
+                )
@@ -0,0 +1,262 @@
+import datetime
+import itertools
+import logging
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.enums import LessonType
+from services.schedule_diff import SubgroupChanges, diff_lessons
+
+logger = logging.getLogger(__name__)
+
+STAGING_TABLE = "lessons_staging"
+SCOPE_TABLE = "lessons_scope"
+LESSON_COLUMNS = (
+    "subgroup_id",
+    "subject",
+    "lesson_type",
+    "date",
+    "start_time",
+    "end_time",
+    "teacher",
+    "address",
+    "room",
+)
+
+CREATE_STAGING_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+    subgroup_id integer NOT NULL,
+    subject varchar(255) NOT NULL,
+    lesson_type lessontype NOT NULL,
+    date date NOT NULL,
+    start_time time NOT NULL,
+    end_time time NOT NULL,
+    teacher varchar(255),
+    address varchar(255),
+    room varchar(100),
+    -- Position in the COPY stream, so the first of duplicate keys wins
+    ordinal bigint GENERATED ALWAYS AS IDENTITY
+) ON COMMIT DROP
+"""
+
+CREATE_SCOPE_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS {SCOPE_TABLE} (
+    subgroup_id integer NOT NULL,
+    lesson_type lessontype NOT NULL,
+    date_from date NOT NULL,
+    date_to date NOT NULL
+) ON COMMIT DROP
+"""
+
+# Rows a write replaces: written by the same schedule, or before lessons had one,
+# since several schedules may write lessons of one scope
+OWNED_CONDITION = "(l.schedule_id IS NULL OR l.schedule_id = :schedule_id)"
+
+# Rows of the replaced scopes that are absent from the new data
+DELETE_STALE_SQL = f"""
+DELETE FROM lessons AS l
+USING {SCOPE_TABLE} AS sc
+WHERE l.subgroup_id = sc.subgroup_id
+  AND l.lesson_type = sc.lesson_type
+  AND l.date BETWEEN sc.date_from AND sc.date_to
+  AND {OWNED_CONDITION}
+  AND NOT EXISTS (
+      SELECT 1 FROM {STAGING_TABLE} AS s
+      WHERE s.subgroup_id = l.subgroup_id
+        AND s.date = l.date
+        AND s.start_time = l.start_time
+        AND s.subject = l.subject
+  )
+"""  # noqa: S608
+
+# Rows the merge may delete or update: those it owns within the scopes and
+# those sharing a key with new data, whatever their lesson type or owner
+SNAPSHOT_SQL = f"""
+SELECT {", ".join(f"l.{column}" for column in LESSON_COLUMNS)}
+FROM lessons AS l
+JOIN {SCOPE_TABLE} AS sc
+  ON l.subgroup_id = sc.subgroup_id
+ AND l.lesson_type = sc.lesson_type
+ AND l.date BETWEEN sc.date_from AND sc.date_to
+WHERE {OWNED_CONDITION}
+UNION
+SELECT {", ".join(f"l.{column}" for column in LESSON_COLUMNS)}
+FROM lessons AS l
+JOIN {STAGING_TABLE} AS s USING (subgroup_id, date, start_time, subject)
+"""  # noqa: S608
+
+# DISTINCT ON since ON CONFLICT DO UPDATE cannot touch the same row twice,
+# keeping the first row of duplicate keys like diff_lessons does, and the
+# WHERE clause skips rewriting rows that did not change. A lesson written by
+# several schedules belongs to the last one writing it.
+UPSERT_SQL = f"""
+INSERT INTO lessons ({", ".join(LESSON_COLUMNS)}, schedule_id)
+SELECT DISTINCT ON (subgroup_id, date, start_time, subject)
+    {", ".join(LESSON_COLUMNS)}, CAST(:schedule_id AS bigint)
+FROM {STAGING_TABLE}
+ORDER BY subgroup_id, date, start_time, subject, ordinal
+ON CONFLICT ON CONSTRAINT uq_lesson_unique DO UPDATE SET
+    lesson_type = EXCLUDED.lesson_type,
+    end_time = EXCLUDED.end_time,
+    teacher = EXCLUDED.teacher,
+    address = EXCLUDED.address,
+    room = EXCLUDED.room,
+    schedule_id = EXCLUDED.schedule_id
+WHERE (
+    lessons.lesson_type,
+    lessons.end_time,
+    lessons.teacher,
+    lessons.address,
+    lessons.room,
+    lessons.schedule_id
+) IS DISTINCT FROM (
+    EXCLUDED.lesson_type,
+    EXCLUDED.end_time,
+    EXCLUDED.teacher,
+    EXCLUDED.address,
+    EXCLUDED.room,
+    EXCLUDED.schedule_id
+)
+"""  # noqa: S608
+
+
+class LessonRecord(NamedTuple):
+    """Lesson row ready to be written, in ``LESSON_COLUMNS`` order."""
+
+    subgroup_id: int
+    subject: str
+    lesson_type: LessonType
+    date: datetime.date
+    start_time: datetime.time
+    end_time: datetime.time
+    teacher: str | None
+    address: str | None
+    room: str | None
+
+
+class LessonScope(NamedTuple):
+    """Lessons of a subgroup and type within a date range, replaced as a whole."""
+
+    subgroup_id: int
+    lesson_type: LessonType
+    date_from: datetime.date
+    date_to: datetime.date
+
+
+@dataclass(slots=True)
+class BulkWriteReport:
+    """Outcome of a bulk write."""
+
+    rows_copied: int = 0
+    rows_upserted: int = 0
+    rows_deleted: int = 0
+    seconds: float = 0.0
+    # Filled only when the write is asked to diff
+    changes: dict[int, SubgroupChanges] = field(default_factory=dict)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_copied / self.seconds if self.seconds else 0.0
+
+
+class LessonBulkWriter:
+    """
+    Bulk lesson writer using COPY into a staging table and a set-based merge.
+
+    Rows are streamed with psycopg COPY in batches of ``batch_size`` into a
+    temporary table. Rows of the given scopes missing from the new data are
+    then deleted, limited to those written by the same ``schedule_id`` or
+    by none, so schedules sharing a scope keep each other's lessons. The
+    rest are merged into ``lessons`` with
+    ``ON CONFLICT`` on ``uq_lesson_unique``. Everything runs in the caller's
+    transaction and takes only row locks, so readers are never blocked.
+
+    With ``diff`` the rows the merge can touch are read back first and
+    compared with the new data by ``diff_lessons``, which costs one scoped
+    query instead of a compare of the whole table.
+    """
+
+    def __init__(self, batch_size: int = 5000):
+        self.batch_size = batch_size
+
+    async def write(
+        self,
+        session: AsyncSession,
+        records: Iterable[LessonRecord],
+        scopes: Iterable[LessonScope] = (),
+        diff: bool = False,
+        schedule_id: int | None = None,
+    ) -> BulkWriteReport:
+        """Replace lessons within ``scopes`` with ``records`` inside the current transaction."""
+        report = BulkWriteReport()
+        parameters = {"schedule_id": schedule_id}
+        if diff:
+            records = list(records)
+        started = time.perf_counter()
+
+        await session.execute(text(CREATE_STAGING_SQL))
+        await session.execute(text(CREATE_SCOPE_SQL))
+        await session.execute(text(f"TRUNCATE {STAGING_TABLE}, {SCOPE_TABLE}"))
+
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+
+        async with driver_connection.cursor() as cursor:
+            await self._copy(cursor, SCOPE_TABLE, LessonScope._fields, scopes)
+            report.rows_copied = await self._copy(cursor, STAGING_TABLE, LESSON_COLUMNS, records)
+
+        await session.execute(text(f"ANALYZE {STAGING_TABLE}"))
+
+        if diff:
+            result = await session.execute(text(SNAPSHOT_SQL), parameters)
+            previous = [
+                LessonRecord(*row[:2], LessonType[row.lesson_type], *row[3:]) for row in result
+            ]
+            report.changes = diff_lessons(previous, records)
+
+        result = await session.execute(text(DELETE_STALE_SQL), parameters)
+        report.rows_deleted = result.rowcount
+        result = await session.execute(text(UPSERT_SQL), parameters)
+        report.rows_upserted = result.rowcount
+
+        report.seconds = time.perf_counter() - started
+        logger.info(
+            "Bulk write: %d rows copied, %d upserted, %d deleted in %.2fs (%.0f rows/s)",
+            report.rows_copied,
+            report.rows_upserted,
+            report.rows_deleted,
+            report.seconds,
+            report.rows_per_second,
+        )
+        return report
+
+    async def _copy(
+        self,
+        cursor,
+        table: str,
+        columns: Iterable[str],
+        rows: Iterable[tuple],
+    ) -> int:
+        """COPY rows into table in batches. Returns number of rows copied."""
+        statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+        total = 0
+        iterator = iter(rows)
+        while batch := list(itertools.islice(iterator, self.batch_size)):
+            async with cursor.copy(statement) as copy:
+                for row in batch:
+                    await copy.write_row(tuple(_copy_value(value) for value in row))
+            total += len(batch)
+        return total
+
+
+def _copy_value(value: object) -> object:
+    # Enum columns store member names
+    if isinstance(value, LessonType):
+        return value.name
+    return value
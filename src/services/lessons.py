@@ -0,0 +1,208 @@
+import datetime
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from sqlalchemy import Date, DateTime, Select, cast, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from models.enums import LessonType
+from models.lesson import Lesson
+
+# Key and included columns of uq_lesson_unique, so lookups are index-only scans
+LESSON_COLUMNS = (
+    Lesson.subgroup_id,
+    Lesson.date,
+    Lesson.start_time,
+    Lesson.subject,
+    Lesson.end_time,
+    Lesson.lesson_type,
+    Lesson.teacher,
+    Lesson.address,
+    Lesson.room,
+)
+WEEK = datetime.timedelta(days=7)
+
+
+@dataclass(frozen=True, slots=True)
+class ScheduledLesson:
+    """Lesson as shown to students, read from the covering index."""
+
+    subgroup_id: int
+    date: datetime.date
+    start_time: datetime.time
+    subject: str
+    end_time: datetime.time
+    lesson_type: LessonType
+    teacher: str | None
+    address: str | None
+    room: str | None
+
+    @property
+    def cursor(self) -> "LessonCursor":
+        return LessonCursor(self.date, self.start_time, self.subject)
+
+
+@dataclass(frozen=True, slots=True)
+class LessonCursor:
+    """Position in the ``(date, start_time, subject)`` order of a subgroup's lessons."""
+
+    date: datetime.date
+    start_time: datetime.time = datetime.time.min
+    subject: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class Week:
+    """Lessons of one Monday to Sunday week."""
+
+    monday: datetime.date
+    lessons: list[ScheduledLesson]
+
+    @property
+    def sunday(self) -> datetime.date:
+        return self.monday + datetime.timedelta(days=6)
+
+
+def week_start(date: datetime.date) -> datetime.date:
+    return date - datetime.timedelta(days=date.weekday())
+
+
+def _ordered(statement: Select, descending: bool = False) -> Select:
+    columns = (Lesson.date, Lesson.start_time, Lesson.subject)
+    return statement.order_by(*(column.desc() for column in columns) if descending else columns)
+
+
+def range_statement(subgroup_id: int, start: datetime.date, end: datetime.date) -> Select:
+    """Lessons from ``start`` to ``end`` inclusive."""
+    return _ordered(
+        select(*LESSON_COLUMNS).where(
+            Lesson.subgroup_id == subgroup_id, Lesson.date.between(start, end)
+        )
+    )
+
+
+def after_statement(subgroup_id: int, cursor: LessonCursor, limit: int) -> Select:
+    position = tuple_(Lesson.date, Lesson.start_time, Lesson.subject)
+    return _ordered(
+        select(*LESSON_COLUMNS).where(
+            Lesson.subgroup_id == subgroup_id,
+            position > tuple_(cursor.date, cursor.start_time, cursor.subject),
+        )
+    ).limit(limit)
+
+
+def before_statement(subgroup_id: int, cursor: LessonCursor, limit: int) -> Select:
+    """Lessons before ``cursor``, latest first."""
+    position = tuple_(Lesson.date, Lesson.start_time, Lesson.subject)
+    return _ordered(
+        select(*LESSON_COLUMNS).where(
+            Lesson.subgroup_id == subgroup_id,
+            position < tuple_(cursor.date, cursor.start_time, cursor.subject),
+        ),
+        descending=True,
+    ).limit(limit)
+
+
+def adjacent_week_statement(subgroup_id: int, week: datetime.date, forward: bool) -> Select:
+    """
+    Lessons of the nearest week after (or before) the week of ``week``
+    that has any, in one round trip.
+
+    Empty weeks such as holidays are skipped: the bound comes from a
+    keyset probe for the first lesson date past the current week.
+    """
+    monday = week_start(week)
+    if forward:
+        nearest = select(func.min(Lesson.date)).where(Lesson.date >= monday + WEEK)
+    else:
+        nearest = select(func.max(Lesson.date)).where(Lesson.date < monday)
+    nearest = nearest.where(Lesson.subgroup_id == subgroup_id).scalar_subquery()
+    # date_trunc of a plain date would go through timestamptz and the session time zone
+    target = cast(func.date_trunc("week", cast(nearest, DateTime)), Date)
+    return _ordered(
+        select(*LESSON_COLUMNS).where(
+            Lesson.subgroup_id == subgroup_id,
+            Lesson.date >= target,
+            Lesson.date < target + WEEK.days,
+        )
+    )
+
+
+class LessonRepository:
+    """
+    Read queries over lessons of a subgroup, ordered by date and start time.
+
+    Only columns stored in the covering ``uq_lesson_unique`` index are read,
+    so Postgres answers from the index alone once the visibility map is up
+    to date (autovacuum keeps it so between syncs). Paging is keyset based:
+    pass the ``cursor`` of the last lesson seen instead of an offset.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+
+    async def _fetch(self, statement: Select) -> list[ScheduledLesson]:
+        async with self.session_factory() as session:
+            result = await session.execute(statement)
+            return [ScheduledLesson(*row) for row in result]
+
+    async def day(self, subgroup_id: int, date: datetime.date) -> list[ScheduledLesson]:
+        return await self._fetch(range_statement(subgroup_id, date, date))
+
+    async def days(
+        self, subgroup_ids: Iterable[int], date: datetime.date
+    ) -> dict[int, list[ScheduledLesson]]:
+        """Lessons of several subgroups on ``date``, keyed by subgroup."""
+        statement = select(*LESSON_COLUMNS).where(
+            Lesson.subgroup_id.in_(list(subgroup_ids)), Lesson.date == date
+        )
+        lessons: defaultdict[int, list[ScheduledLesson]] = defaultdict(list)
+        for lesson in await self._fetch(_ordered(statement.order_by(Lesson.subgroup_id))):
+            lessons[lesson.subgroup_id].append(lesson)
+        return lessons
+
+    async def week(self, subgroup_id: int, date: datetime.date) -> Week:
+        """The Monday to Sunday week containing ``date``."""
+        monday = week_start(date)
+        sunday = monday + datetime.timedelta(days=6)
+        return Week(monday, await self._fetch(range_statement(subgroup_id, monday, sunday)))
+
+    async def between(
+        self, subgroup_id: int, start: datetime.date, end: datetime.date
+    ) -> list[ScheduledLesson]:
+        return await self._fetch(range_statement(subgroup_id, start, end))
+
+    async def after(
+        self, subgroup_id: int, cursor: LessonCursor, limit: int = 50
+    ) -> list[ScheduledLesson]:
+        """Up to ``limit`` lessons following ``cursor``."""
+        return await self._fetch(after_statement(subgroup_id, cursor, limit))
+
+    async def before(
+        self, subgroup_id: int, cursor: LessonCursor, limit: int = 50
+    ) -> list[ScheduledLesson]:
+        """Up to ``limit`` lessons preceding ``cursor``, in ascending order."""
+        lessons = await self._fetch(before_statement(subgroup_id, cursor, limit))
+        lessons.reverse()
+        return lessons
+
+    async def next_lesson(self, subgroup_id: int, now: datetime.datetime) -> ScheduledLesson | None:
+        lessons = await self.after(subgroup_id, LessonCursor(now.date(), now.time()), limit=1)
+        return lessons[0] if lessons else None
+
+    async def next_week(self, subgroup_id: int, week: datetime.date) -> Week | None:
+        """Nearest week with lessons after the week of ``week``, or None at the end."""
+        return await self._adjacent_week(subgroup_id, week, forward=True)
+
+    async def previous_week(self, subgroup_id: int, week: datetime.date) -> Week | None:
+        """Nearest week with lessons before the week of ``week``, or None at the start."""
+        return await self._adjacent_week(subgroup_id, week, forward=False)
+
+    async def _adjacent_week(
+        self, subgroup_id: int, week: datetime.date, forward: bool
+    ) -> Week | None:
+        lessons = await self._fetch(adjacent_week_statement(subgroup_id, week, forward))
+        if not lessons:
+            return None
+        return Week(week_start(lessons[0].date), lessons)
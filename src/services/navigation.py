@@ -0,0 +1,238 @@
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+from redis.asyncio import Redis
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from models.enums import EducationLevel
+from models.lesson import Lesson
+from models.speciality import Speciality
+from models.student_group import Group, Subgroup
+from services.search import SearchIndex, SearchResult
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class SpecialityNode:
+    id: int
+    code: str
+    name: str
+    full_name: str
+    level: EducationLevel | None
+
+
+@dataclass(frozen=True, slots=True)
+class SubgroupNode:
+    id: int
+    group_id: int
+    name: str
+
+
+@dataclass(frozen=True, slots=True)
+class GroupNode:
+    id: int
+    speciality_id: int
+    course_number: int
+    stream: str | None
+    name: str
+    subgroups: tuple[SubgroupNode, ...]
+
+
+class NavigationTree:
+    """
+    Immutable speciality → course → stream → group → subgroup tree.
+
+    Children of every node are precomputed tuples, so building a picker
+    keyboard is a dict lookup. Only branches that end in a subgroup are
+    included.
+    """
+
+    def __init__(self, rows: Iterable[Row] = ()):
+        specialities: dict[int, SpecialityNode] = {}
+        groups: dict[int, tuple] = {}
+        subgroups: defaultdict[int, list[SubgroupNode]] = defaultdict(list)
+        for row in rows:
+            if row.speciality_id not in specialities:
+                specialities[row.speciality_id] = SpecialityNode(
+                    row.speciality_id, row.code, row.clean_name, row.full_name, row.level
+                )
+            groups.setdefault(
+                row.group_id, (row.speciality_id, row.course_number, row.stream, row.group_name)
+            )
+            subgroups[row.group_id].append(
+                SubgroupNode(row.subgroup_id, row.group_id, row.subgroup_name)
+            )
+
+        courses: defaultdict[int, dict[int, None]] = defaultdict(dict)
+        streams: defaultdict[tuple[int, int], dict[str | None, None]] = defaultdict(dict)
+        branches: defaultdict[tuple[int, int, str | None], list[GroupNode]] = defaultdict(list)
+        self._groups: dict[int, GroupNode] = {}
+        for group_id, (speciality_id, course, stream, name) in groups.items():
+            group = GroupNode(
+                group_id, speciality_id, course, stream, name, tuple(subgroups[group_id])
+            )
+            self._groups[group_id] = group
+            # Dicts keep first-seen order of the ordered query without duplicates
+            courses[speciality_id][course] = None
+            streams[speciality_id, course][stream] = None
+            branches[speciality_id, course, stream].append(group)
+
+        self.specialities = tuple(specialities.values())
+        self._specialities = specialities
+        self._courses = {key: tuple(value) for key, value in courses.items()}
+        self._streams = {key: tuple(value) for key, value in streams.items()}
+        self._branches = {key: tuple(value) for key, value in branches.items()}
+        self._subgroups = {
+            subgroup.id: subgroup for group in self._groups.values() for subgroup in group.subgroups
+        }
+
+    def speciality(self, speciality_id: int) -> SpecialityNode | None:
+        return self._specialities.get(speciality_id)
+
+    def courses(self, speciality_id: int) -> tuple[int, ...]:
+        return self._courses.get(speciality_id, ())
+
+    def streams(self, speciality_id: int, course_number: int) -> tuple[str | None, ...]:
+        return self._streams.get((speciality_id, course_number), ())
+
+    def groups(
+        self, speciality_id: int, course_number: int, stream: str | None
+    ) -> tuple[GroupNode, ...]:
+        return self._branches.get((speciality_id, course_number, stream), ())
+
+    def group(self, group_id: int) -> GroupNode | None:
+        return self._groups.get(group_id)
+
+    def subgroup(self, subgroup_id: int) -> SubgroupNode | None:
+        return self._subgroups.get(subgroup_id)
+
+    def __len__(self) -> int:
+        """Number of subgroups."""
+        return len(self._subgroups)
+
+
+NAVIGATION_QUERY = (
+    select(
+        Speciality.id.label("speciality_id"),
+        Speciality.code,
+        Speciality.clean_name,
+        Speciality.full_name,
+        Speciality.level,
+        Group.id.label("group_id"),
+        Group.course_number,
+        Group.stream,
+        Group.name.label("group_name"),
+        Subgroup.id.label("subgroup_id"),
+        Subgroup.name.label("subgroup_name"),
+    )
+    .join(Group, Group.speciality_id == Speciality.id)
+    .join(Subgroup, Subgroup.group_id == Group.id)
+    .order_by(
+        Speciality.code,
+        Speciality.clean_name,
+        Group.course_number,
+        Group.stream.nulls_first(),
+        Group.name,
+        Subgroup.name,
+    )
+)
+TEACHERS_QUERY = select(Lesson.teacher).where(Lesson.teacher.is_not(None)).distinct()
+
+
+class NavigationIndex:
+    """
+    Holder of the current ``NavigationTree`` and the ``SearchIndex`` over it.
+
+    The tree is rebuilt with a single query and swapped in as a whole, so
+    readers always see a consistent tree without locking. The instance that
+    runs the sync rebuilds it from ``on_sync`` and bumps a version key in
+    Redis; other instances poll that key in ``run`` and rebuild on change.
+    With ``with_search`` off, teachers are not loaded and ``search`` finds
+    nothing. Listeners run after every rebuild, on leader and followers
+    alike, so other per-worker caches of lessons can follow the same version.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        redis: Redis | None = None,
+        namespace: str = "szgmu",
+        poll_interval: float = 5.0,
+        with_search: bool = True,
+        min_score: float = 0.3,
+    ):
+        self.session_factory = session_factory
+        self.redis = redis
+        self.version_key = f"{namespace}:navigation:version"
+        self.poll_interval = poll_interval
+        self.with_search = with_search
+        self.min_score = min_score
+        self.tree = NavigationTree()
+        self.search_index = SearchIndex()
+        self.loaded = False
+        self._version: bytes | None = None
+        self._listeners: list[Callable[[], None]] = []
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Call ``listener`` after each rebuild."""
+        self._listeners.append(listener)
+
+    async def refresh(self) -> NavigationTree:
+        """Rebuild the tree from the database and swap it in."""
+        async with self.session_factory() as session:
+            result = await session.execute(NAVIGATION_QUERY)
+            tree = NavigationTree(result)
+            search_index = SearchIndex()
+            if self.with_search:
+                teachers = await session.scalars(TEACHERS_QUERY)
+                search_index = SearchIndex.build(tree, teachers)
+        # No await between the two, readers never see a mismatched pair
+        self.tree = tree
+        self.search_index = search_index
+        self.loaded = True
+        logger.info(
+            "Navigation tree rebuilt: %d specialities, %d subgroups, %d search entries",
+            len(tree.specialities),
+            len(tree),
+            len(search_index),
+        )
+        for listener in self._listeners:
+            try:
+                listener()
+            except Exception:
+                logger.exception("Navigation listener %r failed", listener)
+        return tree
+
+    async def search(self, query: str, limit: int = 10) -> list[SearchResult]:
+        """Top ``limit`` groups, specialities and teachers matching ``query``."""
+        return self.search_index.search(query, limit, self.min_score)
+
+    async def on_sync(self, subgroup_ids: Iterable[int]) -> None:  # noqa: ARG002
+        """Sync listener: rebuild and tell other instances to do the same."""
+        await self.refresh()
+        if self.redis is not None:
+            self._version = str(await self.redis.incr(self.version_key)).encode()
+
+    async def run(self) -> None:
+        """
+        Load the tree, then follow version bumps until cancelled.
+
+        Without Redis there is nobody else to follow, so this returns once
+        the tree is loaded.
+        """
+        while True:
+            try:
+                version = await self.redis.get(self.version_key) if self.redis else None
+                if not self.loaded or version != self._version:
+                    await self.refresh()
+                    self._version = version
+            except Exception:
+                logger.exception("Failed to refresh navigation tree")
+            if self.redis is None and self.loaded:
+                return
+            await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,388 @@
+import asyncio
+import datetime
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable, Mapping
+from zoneinfo import ZoneInfo
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramForbiddenError, TelegramRetryAfter
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import NotificationSettings
+from core.rate_limit import TokenBucket
+from core.shared_cache import SharedCache
+from models.user import User
+from services.digest import Digest, DigestCache, render_changes, render_day
+from services.lessons import LessonRepository
+from services.schedule_diff import SubgroupChanges
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+SEND_ATTEMPTS = 3
+
+
+def minute_of_day(value: datetime.time) -> int:
+    return value.hour * 60 + value.minute
+
+
+class SubscriberWheel:
+    """
+    Timing wheel of subscribers with one slot per minute of the day.
+
+    Finding users due at a given minute is a single slot lookup instead
+    of a scan over all users.
+    """
+
+    def __init__(self) -> None:
+        self._slots: list[set[int]] = [set() for _ in range(MINUTES_PER_DAY)]
+        self._minutes: dict[int, int] = {}
+
+    def add(self, telegram_id: int, notification_time: datetime.time) -> None:
+        self.remove(telegram_id)
+        minute = minute_of_day(notification_time)
+        self._slots[minute].add(telegram_id)
+        self._minutes[telegram_id] = minute
+
+    def remove(self, telegram_id: int) -> None:
+        minute = self._minutes.pop(telegram_id, None)
+        if minute is not None:
+            self._slots[minute].discard(telegram_id)
+
+    def due(self, minute: int) -> set[int]:
+        return set(self._slots[minute % MINUTES_PER_DAY])
+
+    def clear(self) -> None:
+        for slot in self._slots:
+            slot.clear()
+        self._minutes.clear()
+
+    def __len__(self) -> int:
+        return len(self._minutes)
+
+
+class TelegramRateLimiter:
+    """Global and per-chat token buckets for Telegram send limits."""
+
+    def __init__(self, global_rate: float, per_chat_rate: float, max_chats: int = 10_000):
+        self.global_bucket = TokenBucket(global_rate)
+        self.per_chat_rate = per_chat_rate
+        self.max_chats = max_chats
+        self._chats: OrderedDict[int, TokenBucket] = OrderedDict()
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self.per_chat_rate)
+            while len(self._chats) > self.max_chats:
+                self._chats.popitem(last=False)
+        self._chats.move_to_end(chat_id)
+        return bucket
+
+    async def acquire(self, chat_id: int) -> None:
+        await self._chat_bucket(chat_id).acquire()
+        await self.global_bucket.acquire()
+
+    def retry_after(self, chat_id: int, seconds: float) -> None:
+        """Back off after a flood control error."""
+        self._chat_bucket(chat_id).pause(seconds)
+        self.global_bucket.pause(seconds)
+
+
+class NotificationScheduler:
+    """
+    Daily digest scheduler.
+
+    Subscribers are indexed in a ``SubscriberWheel`` by notification minute,
+    loaded with one query and reloaded every ``reload_interval_seconds``.
+    Every minute the due slot is grouped by subgroup, each subgroup's digest
+    is rendered once (or taken from ``DigestCache``) and fanned out through
+    ``TelegramRateLimiter``. With a ``SharedCache`` rendered texts are also
+    shared between bot instances for ``cache_ttl`` seconds.
+
+    ``notify_changes`` sends subscribers of changed subgroups one message
+    per subgroup listing what the sync changed in the coming
+    ``changes_horizon_days`` days.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        session_factory: async_sessionmaker[AsyncSession],
+        settings: NotificationSettings,
+        shared_cache: SharedCache | None = None,
+        cache_ttl: float = 3600.0,
+    ):
+        self.bot = bot
+        self.session_factory = session_factory
+        self.lessons = LessonRepository(session_factory)
+        self.settings = settings
+        self.timezone = ZoneInfo(settings.timezone)
+        self.wheel = SubscriberWheel()
+        self.limiter = TelegramRateLimiter(settings.global_rate, settings.per_chat_rate)
+        self.digests = DigestCache()
+        self.shared_cache = shared_cache
+        self.cache_ttl = cache_ttl
+        # Dates with digests in the shared cache, until those entries expire
+        self._shared_dates: dict[datetime.date, float] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load_subscribers(self) -> None:
+        """Rebuild the wheel from subscribed users."""
+        async with self.session_factory() as session:
+            rows = await session.execute(
+                select(User.telegram_id, User.notification_time).where(
+                    User.is_subscribed.is_(True), User.subgroup_id.is_not(None)
+                )
+            )
+            self.wheel.clear()
+            for telegram_id, notification_time in rows:
+                self.wheel.add(telegram_id, notification_time)
+        logger.info("Loaded %d subscribers", len(self.wheel))
+
+    def subscribe(self, telegram_id: int, notification_time: datetime.time) -> None:
+        """Register subscription change without waiting for a reload."""
+        self.wheel.add(telegram_id, notification_time)
+
+    def unsubscribe(self, telegram_id: int) -> None:
+        self.wheel.remove(telegram_id)
+
+    async def invalidate(self, subgroup_ids: Iterable[int]) -> None:
+        """Drop cached digests of subgroups whose lessons changed."""
+        subgroup_ids = set(subgroup_ids)
+        self.digests.invalidate(subgroup_ids)
+        if self.shared_cache is not None:
+            now = time.monotonic()
+            self._shared_dates = {
+                date: expires_at
+                for date, expires_at in self._shared_dates.items()
+                if expires_at > now
+            }
+            # Today's may have been written by the instance that ran the jobs before
+            dates = {*self._shared_dates, datetime.datetime.now(self.timezone).date()}
+            await self.shared_cache.delete(
+                *(
+                    self._shared_key(subgroup_id, date)
+                    for subgroup_id in subgroup_ids
+                    for date in dates
+                )
+            )
+
+    async def notify_changes(self, changes: Mapping[int, SubgroupChanges]) -> None:
+        """Sync listener: send upcoming lesson changes to subscribers in the background."""
+        today = datetime.datetime.now(self.timezone).date()
+        horizon = today + datetime.timedelta(days=self.settings.changes_horizon_days)
+        upcoming = {}
+        for subgroup_id, subgroup_changes in changes.items():
+            subgroup_changes = subgroup_changes.between(today, horizon)
+            if subgroup_changes:
+                upcoming[subgroup_id] = subgroup_changes
+        if not upcoming:
+            return
+
+        task = asyncio.create_task(self._send_changes(upcoming))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_changes(self, changes: dict[int, SubgroupChanges]) -> None:
+        async with self.session_factory() as session:
+            users = await session.execute(
+                select(User.telegram_id, User.subgroup_id).where(
+                    User.is_subscribed.is_(True), User.subgroup_id.in_(list(changes))
+                )
+            )
+            recipients = users.all()
+        if not recipients:
+            return
+
+        # Rendered once per subgroup, only for subgroups someone follows
+        messages: dict[int, Digest] = {}
+        for _, subgroup_id in recipients:
+            if subgroup_id not in messages:
+                messages[subgroup_id] = Digest(render_changes(changes[subgroup_id]))
+        logger.info(
+            "Sending changes of %d subgroups to %d subscribers", len(messages), len(recipients)
+        )
+        await self.fan_out(
+            (telegram_id, messages[subgroup_id]) for telegram_id, subgroup_id in recipients
+        )
+
+    async def run_forever(self) -> None:
+        """Fire due wheel slots every minute until cancelled."""
+        await self.load_subscribers()
+        reload_interval = datetime.timedelta(seconds=self.settings.reload_interval_seconds)
+        next_reload = datetime.datetime.now(self.timezone) + reload_interval
+        next_fire = self._current_minute() + datetime.timedelta(minutes=1)
+
+        try:
+            while True:
+                now = datetime.datetime.now(self.timezone)
+                if now >= next_reload:
+                    await self.load_subscribers()
+                    next_reload = now + reload_interval
+
+                # Catch up on minutes missed while the loop was busy
+                while next_fire <= now:
+                    self._fire(next_fire)
+                    next_fire += datetime.timedelta(minutes=1)
+
+                await asyncio.sleep(
+                    (next_fire - datetime.datetime.now(self.timezone)).total_seconds()
+                )
+        finally:
+            for task in self._tasks:
+                task.cancel()
+
+    def _current_minute(self) -> datetime.datetime:
+        return datetime.datetime.now(self.timezone).replace(second=0, microsecond=0)
+
+    def _fire(self, at: datetime.datetime) -> None:
+        telegram_ids = self.wheel.due(minute_of_day(at.time()))
+        if not telegram_ids:
+            return
+
+        logger.info("Sending %d digests for %s", len(telegram_ids), at.strftime("%H:%M"))
+        task = asyncio.create_task(self.dispatch(telegram_ids, at.date()))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def dispatch(self, telegram_ids: Iterable[int], date: datetime.date) -> None:
+        """Render and send digests for the given users."""
+        messages = await self._render(telegram_ids, date)
+        await self.fan_out(messages)
+
+    async def _render(
+        self,
+        telegram_ids: Iterable[int],
+        date: datetime.date,
+    ) -> list[tuple[int, Digest]]:
+        """Render one digest per subgroup and pair it with every member."""
+        async with self.session_factory() as session:
+            users = await session.execute(
+                select(User.telegram_id, User.subgroup_id).where(
+                    User.telegram_id.in_(list(telegram_ids)), User.subgroup_id.is_not(None)
+                )
+            )
+            members: defaultdict[int, list[int]] = defaultdict(list)
+            for telegram_id, subgroup_id in users:
+                members[subgroup_id].append(telegram_id)
+
+        digests: dict[int, Digest] = {}
+        missing: list[int] = []
+        for subgroup_id in members:
+            digest = self.digests.get(subgroup_id, date)
+            if digest is None:
+                missing.append(subgroup_id)
+            else:
+                digests[subgroup_id] = digest
+
+        if missing and self.shared_cache is not None:
+            missing = await self._load_shared(missing, date, digests)
+        rendered = len(missing)
+
+        if missing:
+            # A sync may commit while lessons are read, its invalidation bumps the version
+            version = self.digests.version
+            lessons = await self.lessons.days(missing, date)
+            for subgroup_id in missing:
+                digests[subgroup_id] = Digest(render_day(date, lessons.get(subgroup_id, [])))
+            if self.digests.version == version:
+                for subgroup_id in missing:
+                    self.digests.set(subgroup_id, date, digests[subgroup_id])
+                if self.shared_cache is not None:
+                    await self._store_shared(missing, date, digests, version)
+
+        logger.debug("Rendered %d of %d subgroup digests for %s", rendered, len(members), date)
+        return [
+            (telegram_id, digests[subgroup_id])
+            for subgroup_id, telegram_ids in members.items()
+            for telegram_id in telegram_ids
+        ]
+
+    @staticmethod
+    def _shared_key(subgroup_id: int, date: datetime.date) -> str:
+        return f"digest:{subgroup_id}:{date.isoformat()}"
+
+    async def _store_shared(
+        self,
+        subgroup_ids: list[int],
+        date: datetime.date,
+        digests: dict[int, Digest],
+        version: int,
+    ) -> None:
+        keys = [self._shared_key(subgroup_id, date) for subgroup_id in subgroup_ids]
+        self._shared_dates[date] = time.monotonic() + self.cache_ttl
+        await self.shared_cache.set_many(
+            {
+                key: digests[subgroup_id].text.encode()
+                for key, subgroup_id in zip(keys, subgroup_ids, strict=True)
+            },
+            self.cache_ttl,
+        )
+        # An invalidation during the write may have deleted the keys before they were set
+        if self.digests.version != version:
+            await self.shared_cache.delete(*keys)
+
+    async def _load_shared(
+        self,
+        subgroup_ids: list[int],
+        date: datetime.date,
+        digests: dict[int, Digest],
+    ) -> list[int]:
+        """Fill ``digests`` from the shared cache. Returns subgroups still missing."""
+        texts = await self.shared_cache.get_many(
+            self._shared_key(subgroup_id, date) for subgroup_id in subgroup_ids
+        )
+        missing = []
+        for subgroup_id, text in zip(subgroup_ids, texts, strict=True):
+            if text is None:
+                missing.append(subgroup_id)
+            else:
+                digest = digests[subgroup_id] = Digest(text.decode())
+                self.digests.set(subgroup_id, date, digest)
+        return missing
+
+    async def fan_out(self, messages: Iterable[tuple[int, Digest]]) -> int:
+        """Send messages concurrently within rate limits. Returns number delivered."""
+        semaphore = asyncio.Semaphore(self.settings.concurrency)
+
+        async def send(chat_id: int, digest: Digest) -> bool:
+            async with semaphore:
+                return await self._send(chat_id, digest)
+
+        results = await asyncio.gather(*(send(chat_id, digest) for chat_id, digest in messages))
+        delivered = sum(results)
+        logger.info("Delivered %d of %d digests", delivered, len(results))
+        return delivered
+
+    async def _send(self, chat_id: int, digest: Digest) -> bool:
+        for _ in range(SEND_ATTEMPTS):
+            await self.limiter.acquire(chat_id)
+            try:
+                await self.bot.send_message(chat_id, digest.text)
+                return True
+
+            except TelegramRetryAfter as e:
+                logger.warning("Flood control for chat %d, retry after %ds", chat_id, e.retry_after)
+                self.limiter.retry_after(chat_id, e.retry_after)
+
+            except TelegramForbiddenError:
+                logger.info("Bot blocked by %d, unsubscribing", chat_id)
+                await self._unsubscribe_blocked(chat_id)
+                return False
+
+            except TelegramAPIError as e:
+                logger.error("Failed to send digest to %d: %s", chat_id, str(e))
+                return False
+
+        return False
+
+    async def _unsubscribe_blocked(self, telegram_id: int) -> None:
+        self.wheel.remove(telegram_id)
+        async with self.session_factory() as session, session.begin():
+            await session.execute(
+                update(User).where(User.telegram_id == telegram_id).values(is_subscribed=False)
+            )
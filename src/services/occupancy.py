@@ -0,0 +1,293 @@
+import asyncio
+import bisect
+import datetime
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from models.lesson import Lesson
+from services.search import normalize
+
+logger = logging.getLogger(__name__)
+
+DAY_START = 0
+DAY_END = 24 * 60
+
+RoomKey = tuple[str, str]
+
+
+def minute_of_day(value: datetime.time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def time_of_minute(minute: int) -> datetime.time:
+    return datetime.time.max if minute >= DAY_END else datetime.time(minute // 60, minute % 60)
+
+
+@dataclass(frozen=True, slots=True)
+class Occupation:
+    """A lesson holding a room and a teacher, once even if several subgroups attend."""
+
+    start_time: datetime.time
+    end_time: datetime.time
+    subject: str
+    teacher: str | None
+    address: str | None
+    room: str | None
+
+
+class IntervalIndex:
+    """
+    Static interval index of one day.
+
+    Intervals are sorted by start with a running maximum of ends, so an
+    overlap query bisects to the last interval starting before the window
+    ends and walks back only while earlier intervals can still reach into it.
+    """
+
+    def __init__(self, occupations: Iterable[Occupation]):
+        ordered = sorted(
+            occupations, key=lambda item: (minute_of_day(item.start_time), item.end_time)
+        )
+        self.occupations = tuple(ordered)
+        self._starts = [minute_of_day(item.start_time) for item in ordered]
+        self._ends = [minute_of_day(item.end_time) for item in ordered]
+        self._reach: list[int] = []
+        reach = DAY_START
+        for end in self._ends:
+            reach = max(reach, end)
+            self._reach.append(reach)
+
+    def overlapping(self, start: int, end: int) -> list[Occupation]:
+        """Occupations intersecting ``[start, end)`` minutes, ordered by start."""
+        found = []
+        position = bisect.bisect_left(self._starts, end) - 1
+        while position >= 0 and self._reach[position] > start:
+            if self._ends[position] > start:
+                found.append(self.occupations[position])
+            position -= 1
+        found.reverse()
+        return found
+
+    def is_free(self, start: int, end: int) -> bool:
+        position = bisect.bisect_left(self._starts, end) - 1
+        return position < 0 or self._reach[position] <= start
+
+    def gaps(self, start: int, end: int) -> Iterator[tuple[int, int]]:
+        """Free ``(start, end)`` minute ranges within ``[start, end)``."""
+        cursor = start
+        for occupation in self.overlapping(start, end):
+            occupied_from = minute_of_day(occupation.start_time)
+            if occupied_from > cursor:
+                yield cursor, occupied_from
+            cursor = max(cursor, minute_of_day(occupation.end_time))
+        if cursor < end:
+            yield cursor, end
+
+
+class DayOccupancy:
+    """Interval indexes of one day's lessons by room and by teacher."""
+
+    def __init__(
+        self,
+        date: datetime.date,
+        occupations: Iterable[Occupation],
+        rooms: dict[str, tuple[str, ...]],
+    ):
+        self.date = date
+        self.rooms = rooms
+        by_room: defaultdict[RoomKey, set[Occupation]] = defaultdict(set)
+        by_teacher: defaultdict[str, set[Occupation]] = defaultdict(set)
+        for occupation in occupations:
+            if occupation.address is not None and occupation.room is not None:
+                by_room[occupation.address, occupation.room].add(occupation)
+            if occupation.teacher:
+                by_teacher[normalize(occupation.teacher)].add(occupation)
+        self._rooms = {key: IntervalIndex(items) for key, items in by_room.items()}
+        self._teachers = {key: IntervalIndex(items) for key, items in by_teacher.items()}
+        self._empty = IntervalIndex(())
+
+    def room(self, address: str, room: str) -> IntervalIndex:
+        return self._rooms.get((address, room), self._empty)
+
+    def teacher(self, teacher: str) -> IntervalIndex:
+        return self._teachers.get(normalize(teacher), self._empty)
+
+    def free_rooms(self, address: str, start: int, end: int) -> list[str]:
+        """Rooms at ``address`` with no lesson in ``[start, end)`` minutes."""
+        return [
+            room
+            for room in self.rooms.get(address, ())
+            if self.room(address, room).is_free(start, end)
+        ]
+
+
+class OccupancyIndex:
+    """
+    Free-room and teacher-location lookups over per-day interval indexes.
+
+    A day is loaded with one query on first use and kept for the most
+    recent ``max_days`` days; concurrent first lookups share the load.
+    ``invalidate`` drops the days after a sync changed lessons. Rooms known
+    at an address come from all lessons, so a room without lessons on the
+    day is reported free. That catalogue scans the whole table, so it
+    survives invalidation and is only reloaded every ``rooms_ttl`` seconds;
+    rooms first seen in a loaded day are added to it meanwhile.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_days: int = 14,
+        rooms_ttl: float = 3600.0,
+    ):
+        self.session_factory = session_factory
+        self.max_days = max_days
+        self.rooms_ttl = rooms_ttl
+        self._days: OrderedDict[datetime.date, DayOccupancy] = OrderedDict()
+        self._loading: dict[datetime.date, asyncio.Task] = {}
+        self._rooms: dict[str, tuple[str, ...]] | None = None
+        self._rooms_loaded_at = 0.0
+        self._generation = 0
+
+    def invalidate(self) -> None:
+        self._days.clear()
+        # Loads already running finish for their waiters, new lookups start over
+        self._loading.clear()
+        self._generation += 1
+
+    async def day(self, date: datetime.date) -> DayOccupancy:
+        occupancy = self._days.get(date)
+        if occupancy is not None:
+            self._days.move_to_end(date)
+            return occupancy
+
+        task = self._loading.get(date)
+        if task is None:
+            task = asyncio.create_task(self._load(date, self._generation))
+            self._loading[date] = task
+            task.add_done_callback(lambda t: self._forget_loading(date, t))
+        # Shield so that a cancelled waiter does not cancel the shared load
+        return await asyncio.shield(task)
+
+    def _forget_loading(self, date: datetime.date, task: asyncio.Task) -> None:
+        if self._loading.get(date) is task:
+            del self._loading[date]
+        if not task.cancelled():
+            task.exception()
+
+    async def _room_catalogue(self, session: AsyncSession) -> dict[str, tuple[str, ...]]:
+        if self._rooms is not None and time.monotonic() - self._rooms_loaded_at < self.rooms_ttl:
+            return self._rooms
+        catalogue: defaultdict[str, list[str]] = defaultdict(list)
+        for address, room in await session.execute(
+            select(Lesson.address, Lesson.room)
+            .where(Lesson.address.is_not(None), Lesson.room.is_not(None))
+            .distinct()
+            .order_by(Lesson.address, Lesson.room)
+        ):
+            catalogue[address].append(room)
+        self._rooms = {address: tuple(names) for address, names in catalogue.items()}
+        self._rooms_loaded_at = time.monotonic()
+        return self._rooms
+
+    def _add_rooms(self, occupations: Iterable[Occupation]) -> dict[str, tuple[str, ...]]:
+        """The catalogue with rooms of ``occupations`` it doesn't list yet."""
+        rooms = self._rooms or {}
+        added: defaultdict[str, set[str]] = defaultdict(set)
+        for occupation in occupations:
+            address, room = occupation.address, occupation.room
+            if address is not None and room is not None and room not in rooms.get(address, ()):
+                added[address].add(room)
+        if added:
+            rooms = dict(rooms)
+            for address, names in added.items():
+                rooms[address] = tuple(sorted({*rooms.get(address, ()), *names}))
+            self._rooms = rooms
+        return rooms
+
+    async def _load(self, date: datetime.date, generation: int) -> DayOccupancy:
+        async with self.session_factory() as session:
+            await self._room_catalogue(session)
+            result = await session.execute(
+                select(
+                    Lesson.start_time,
+                    Lesson.end_time,
+                    Lesson.subject,
+                    Lesson.teacher,
+                    Lesson.address,
+                    Lesson.room,
+                ).where(Lesson.date == date)
+            )
+            occupations = [Occupation(*row) for row in result]
+        occupancy = DayOccupancy(date, occupations, self._add_rooms(occupations))
+
+        # Lessons may have changed while loading, serve the result but don't keep it
+        if generation == self._generation:
+            self._days[date] = occupancy
+            while len(self._days) > self.max_days:
+                self._days.popitem(last=False)
+        logger.debug("Loaded occupancy of %s", date)
+        return occupancy
+
+    async def free_rooms(
+        self,
+        address: str,
+        date: datetime.date,
+        start: datetime.time,
+        end: datetime.time,
+    ) -> list[str]:
+        """Rooms at ``address`` free from ``start`` to ``end`` on ``date``."""
+        day = await self.day(date)
+        return day.free_rooms(address, minute_of_day(start), _end_minute(end))
+
+    async def room_occupancy(
+        self,
+        address: str,
+        room: str,
+        date: datetime.date,
+        start: datetime.time = datetime.time.min,
+        end: datetime.time = datetime.time.max,
+    ) -> list[Occupation]:
+        day = await self.day(date)
+        return day.room(address, room).overlapping(minute_of_day(start), _end_minute(end))
+
+    async def free_slots(
+        self,
+        address: str,
+        room: str,
+        date: datetime.date,
+        start: datetime.time = datetime.time.min,
+        end: datetime.time = datetime.time.max,
+    ) -> list[tuple[datetime.time, datetime.time]]:
+        """Free time ranges of a room within ``start`` to ``end``."""
+        day = await self.day(date)
+        gaps = day.room(address, room).gaps(minute_of_day(start), _end_minute(end))
+        return [(time_of_minute(gap_start), time_of_minute(gap_end)) for gap_start, gap_end in gaps]
+
+    async def teacher_at(self, teacher: str, moment: datetime.datetime) -> Occupation | None:
+        """The lesson ``teacher`` is giving at ``moment``, if any."""
+        day = await self.day(moment.date())
+        minute = minute_of_day(moment.time())
+        lessons = day.teacher(teacher).overlapping(minute, minute + 1)
+        return lessons[0] if lessons else None
+
+    async def teacher_occupancy(
+        self,
+        teacher: str,
+        date: datetime.date,
+        start: datetime.time = datetime.time.min,
+        end: datetime.time = datetime.time.max,
+    ) -> list[Occupation]:
+        day = await self.day(date)
+        return day.teacher(teacher).overlapping(minute_of_day(start), _end_minute(end))
+
+
+def _end_minute(end: datetime.time) -> int:
+    """``time.max`` stands for the end of the day."""
+    return DAY_END if end == datetime.time.max else minute_of_day(end)
@@ -0,0 +1,102 @@
+import datetime
+import hashlib
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from services.lesson_writer import LessonRecord
+
+# Fields of uq_lesson_unique
+LessonKey = tuple[int, datetime.date, datetime.time, str]
+
+
+def lesson_key(record: "LessonRecord") -> LessonKey:
+    return record.subgroup_id, record.date, record.start_time, record.subject
+
+
+def lesson_fingerprint(record: "LessonRecord") -> bytes:
+    """Hash of every stored field, the same in every process and run."""
+    payload = "\x1f".join(
+        "" if value is None else str(value)
+        for value in (
+            record.subgroup_id,
+            record.date,
+            record.start_time,
+            record.subject,
+            record.lesson_type,
+            record.end_time,
+            record.teacher,
+            record.address,
+            record.room,
+        )
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+
+@dataclass(slots=True)
+class SubgroupChanges:
+    """Lessons of one subgroup added, removed or modified by a sync."""
+
+    added: list["LessonRecord"] = field(default_factory=list)
+    removed: list["LessonRecord"] = field(default_factory=list)
+    # Pairs of the stored lesson and its replacement
+    modified: list[tuple["LessonRecord", "LessonRecord"]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.modified)
+
+    def between(self, start: datetime.date, end: datetime.date) -> "SubgroupChanges":
+        """Changes to lessons dated from ``start`` to ``end`` inclusive."""
+        return SubgroupChanges(
+            [record for record in self.added if start <= record.date <= end],
+            [record for record in self.removed if start <= record.date <= end],
+            [
+                (before, after)
+                for before, after in self.modified
+                if start <= before.date <= end or start <= after.date <= end
+            ],
+        )
+
+    def merge(self, other: "SubgroupChanges") -> None:
+        self.added.extend(other.added)
+        self.removed.extend(other.removed)
+        self.modified.extend(other.modified)
+
+
+def diff_lessons(
+    previous: Iterable["LessonRecord"],
+    current: Iterable["LessonRecord"],
+) -> dict[int, SubgroupChanges]:
+    """
+    Changes turning ``previous`` lessons into ``current``, by subgroup.
+
+    Lessons are matched on their ``uq_lesson_unique`` key and compared by
+    fingerprint, so the diff is linear in the number of lessons. A lesson
+    that moved to another time is a removal plus an addition, since the
+    key includes the start time. Of duplicate keys in ``current`` the first
+    one wins. Subgroups without changes are left out.
+    """
+    stored = {lesson_key(record): record for record in previous}
+    fingerprints = {key: lesson_fingerprint(record) for key, record in stored.items()}
+    changes: defaultdict[int, SubgroupChanges] = defaultdict(SubgroupChanges)
+    seen: set[LessonKey] = set()
+
+    for record in current:
+        key = lesson_key(record)
+        if key in seen:
+            continue
+        seen.add(key)
+        before = stored.pop(key, None)
+        if before is None:
+            changes[record.subgroup_id].added.append(record)
+        elif fingerprints[key] != lesson_fingerprint(record):
+            changes[record.subgroup_id].modified.append((before, record))
+
+    for record in stored.values():
+        changes[record.subgroup_id].removed.append(record)
+    return dict(changes)
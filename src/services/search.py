@@ -0,0 +1,387 @@
+import bisect
+import heapq
+import re
+from collections import Counter, OrderedDict, defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Integer, func, literal, literal_column, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.metrics import record_cache_lookup
+from models.lesson import Lesson
+from models.speciality import Speciality
+from models.student_group import Group
+
+if TYPE_CHECKING:
+    from services.navigation import NavigationTree
+
+SEPARATORS_RE = re.compile(r"[\W_]+")
+# "л101" and "л-101" both become "л 101"
+LETTER_DIGIT_RE = re.compile(r"(?<=[^\W\d_])(?=\d)|(?<=\d)(?=[^\W\d_])")
+
+
+class SearchKind(StrEnum):
+    GROUP = "group"
+    SPECIALITY = "speciality"
+    TEACHER = "teacher"
+
+
+@dataclass(frozen=True, slots=True)
+class SearchResult:
+    kind: SearchKind
+    id: int | None
+    title: str
+    score: float
+
+
+def normalize(value: str) -> str:
+    """Lower case, ``ё`` as ``е``, words separated by single spaces."""
+    value = value.casefold().replace("ё", "е")
+    value = LETTER_DIGIT_RE.sub(" ", value)
+    return " ".join(SEPARATORS_RE.sub(" ", value).split())
+
+
+def trigrams(normalized: str) -> set[str]:
+    """Trigrams of every word, padded like ``pg_trgm`` does."""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def initials(name: str) -> str:
+    """``Лечебное дело`` -> ``лд``, the way students abbreviate specialities."""
+    return "".join(word[0] for word in normalize(name).split() if not word.isdigit())
+
+
+# Word weights of document fields: own names count fully, the speciality
+# of a group only half, so a speciality outranks its own groups
+PRIMARY = 1.0
+SECONDARY = 0.5
+# Vocabulary words close enough to stand in for a misspelt query word
+MIN_WORD_SIMILARITY = 0.4
+MAX_SIMILAR_WORDS = 8
+
+
+def word_credit(token: str, length: int) -> float:
+    """How well a word of ``length`` matches query ``token`` it starts with: 1 when equal."""
+    return 0.5 + 0.5 * len(token) / length
+
+
+class Vocabulary:
+    """
+    Sorted words of one length with their entries laid out flat.
+
+    Entries of consecutive words follow each other in one list per field
+    weight, so all entries of a prefix range are a single slice.
+    """
+
+    __slots__ = ("postings", "words")
+
+    def __init__(self, words: dict[str, dict[int, float]]):
+        self.words = sorted(words)
+        # Field weight -> (offset of every word plus the end, entries)
+        self.postings: dict[float, tuple[list[int], list[int]]] = {}
+        for weight in {weight for entries in words.values() for weight in entries.values()}:
+            offsets, flat = [], []
+            for word in self.words:
+                offsets.append(len(flat))
+                flat.extend(entry_id for entry_id, own in words[word].items() if own == weight)
+            offsets.append(len(flat))
+            self.postings[weight] = offsets, flat
+
+    def prefixed(self, token: str) -> tuple[int, int]:
+        """Range of words starting with ``token``."""
+        start = bisect.bisect_left(self.words, token)
+        return start, bisect.bisect_left(self.words, token + "\uffff", start)
+
+    def entries(self, start: int, end: int) -> Iterator[tuple[float, list[int]]]:
+        for weight, (offsets, flat) in self.postings.items():
+            yield weight, flat[offsets[start] : offsets[end]]
+
+
+class SearchIndex:
+    """
+    In-process fuzzy search over groups, specialities and teachers.
+
+    Documents are split into weighted words kept in a sorted vocabulary, so
+    every query word is matched by prefix with a bisect, crediting a word in
+    proportion to how much of it the query covers. Query words matching no
+    prefix fall back to similar vocabulary words by trigrams, which handles
+    typos while only scanning the vocabulary, not the documents. The score
+    is the mean credit over query words; ties go to shorter titles. Credits
+    per query word and whole results are kept in LRUs, since chats repeat
+    the same few queries and typing extends the same words.
+    """
+
+    def __init__(self, max_cached_results: int = 1024) -> None:
+        self.max_cached_results = max_cached_results
+        self._results: OrderedDict[tuple, list[SearchResult]] = OrderedDict()
+        self._token_cache: OrderedDict[str, dict[int, float]] = OrderedDict()
+        self._entries: list[tuple[SearchKind, int | None, str]] = []
+        # Position of every entry when ordered by title length, for ties
+        self._title_ranks: list[int] = []
+        # By word length, shortest first
+        self._vocabularies: dict[int, Vocabulary] = {}
+        self._word_grams: dict[str, list[str]] = {}
+        self._gram_counts: dict[str, int] = {}
+
+    @classmethod
+    def build(cls, tree: "NavigationTree", teachers: Iterable[str]) -> "SearchIndex":
+        index = cls()
+        documents: list[tuple[SearchKind, int | None, str, list[tuple[str, float]]]] = []
+        for speciality in tree.specialities:
+            documents.append(
+                (
+                    SearchKind.SPECIALITY,
+                    speciality.id,
+                    speciality.full_name,
+                    [(speciality.full_name, PRIMARY), (initials(speciality.name), PRIMARY)],
+                )
+            )
+            speciality_words = f"{speciality.name} {initials(speciality.name)}"
+            for course in tree.courses(speciality.id):
+                for stream in tree.streams(speciality.id, course):
+                    for group in tree.groups(speciality.id, course, stream):
+                        documents.append(
+                            (
+                                SearchKind.GROUP,
+                                group.id,
+                                f"{group.name} · {speciality.name}, {course} курс",
+                                [(group.name, PRIMARY), (speciality_words, SECONDARY)],
+                            )
+                        )
+        documents.extend((SearchKind.TEACHER, None, name, [(name, PRIMARY)]) for name in teachers)
+
+        postings: defaultdict[str, dict[int, float]] = defaultdict(dict)
+        for entry_id, (kind, row_id, title, fields) in enumerate(documents):
+            index._entries.append((kind, row_id, title))
+            for text, weight in fields:
+                for word in normalize(text).split():
+                    entries = postings[word]
+                    entries[entry_id] = max(entries.get(entry_id, 0.0), weight)
+
+        order = sorted(range(len(documents)), key=lambda entry_id: len(documents[entry_id][2]))
+        index._title_ranks = [0] * len(documents)
+        for rank, entry_id in enumerate(order):
+            index._title_ranks[entry_id] = rank
+
+        by_length: defaultdict[int, dict[str, dict[int, float]]] = defaultdict(dict)
+        for word, entries in postings.items():
+            by_length[len(word)][word] = entries
+        index._vocabularies = {
+            length: Vocabulary(by_length[length]) for length in sorted(by_length)
+        }
+        word_grams: defaultdict[str, list[str]] = defaultdict(list)
+        for word in postings:
+            grams = trigrams(word)
+            index._gram_counts[word] = len(grams)
+            for gram in grams:
+                word_grams[gram].append(word)
+        index._word_grams = dict(word_grams)
+        return index
+
+    def _similar_words(self, token: str) -> list[tuple[str, float]]:
+        """Vocabulary words most similar to ``token`` by trigrams, as ``pg_trgm`` measures."""
+        grams = trigrams(token)
+        shared: Counter[str] = Counter()
+        for gram in grams:
+            shared.update(self._word_grams.get(gram, ()))
+        similar = []
+        for word, count in shared.items():
+            similarity = count / (len(grams) + self._gram_counts[word] - count)
+            if similarity >= MIN_WORD_SIMILARITY:
+                similar.append((word, similarity))
+        return heapq.nlargest(MAX_SIMILAR_WORDS, similar, key=lambda item: item[1])
+
+    def _credits(self, token: str) -> dict[int, float]:
+        """Best credit of every entry for one query word."""
+        credits = self._token_cache.get(token)
+        if credits is not None:
+            self._token_cache.move_to_end(token)
+            return credits
+
+        groups: list[tuple[float, list[int]]] = []
+        for length, vocabulary in self._vocabularies.items():
+            if length < len(token):
+                continue
+            start, end = vocabulary.prefixed(token)
+            if start < end:
+                credit = word_credit(token, length)
+                groups.extend(
+                    (credit * weight, entries) for weight, entries in vocabulary.entries(start, end)
+                )
+        # Typos only, a word matching by prefix is a better guess than any similar one
+        if not groups and len(token) >= 3:
+            for word, similarity in self._similar_words(token):
+                vocabulary = self._vocabularies[len(word)]
+                start = bisect.bisect_left(vocabulary.words, word)
+                groups.extend(
+                    (similarity * weight, entries)
+                    for weight, entries in vocabulary.entries(start, start + 1)
+                )
+        # Lowest first, so better credits of an entry overwrite worse ones
+        groups.sort(key=lambda group: group[0])
+        credits = {}
+        for value, entries in groups:
+            credits.update(dict.fromkeys(entries, value))
+
+        self._token_cache[token] = credits
+        if len(self._token_cache) > self.max_cached_results:
+            self._token_cache.popitem(last=False)
+        return credits
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        min_score: float = 0.3,
+        kinds: Iterable[SearchKind] | None = None,
+    ) -> list[SearchResult]:
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        allowed = frozenset(kinds) if kinds is not None else None
+        # The index never changes, so results stay valid for its lifetime
+        key = (normalized, limit, min_score, allowed)
+        results = self._results.get(key)
+        record_cache_lookup("search", hit=results is not None)
+        if results is not None:
+            self._results.move_to_end(key)
+            return results
+
+        results = self._search(normalized, limit, min_score, allowed)
+        self._results[key] = results
+        if len(self._results) > self.max_cached_results:
+            self._results.popitem(last=False)
+        return results
+
+    def _search(
+        self,
+        normalized: str,
+        limit: int,
+        min_score: float,
+        allowed: frozenset[SearchKind] | None,
+    ) -> list[SearchResult]:
+        tokens = list(dict.fromkeys(normalized.split()))
+        token_credits = sorted((self._credits(token) for token in tokens), key=len, reverse=True)
+        # Copying the largest set is a C-level operation, only the others are summed here
+        scores = dict(token_credits[0])
+        for credits in token_credits[1:]:
+            for entry_id, credit in credits.items():
+                scores[entry_id] = scores.get(entry_id, 0.0) + credit
+        if allowed is not None:
+            scores = {
+                entry_id: score
+                for entry_id, score in scores.items()
+                if self._entries[entry_id][0] in allowed
+            }
+
+        # Credits take few distinct values, so the score the top ``limit`` reach
+        # down to is found by counting values instead of ranking every entry
+        cutoff = min_score * len(tokens)
+        ranked = 0
+        for score, count in sorted(Counter(scores.values()).items(), reverse=True):
+            if score < cutoff:
+                break
+            ranked += count
+            if ranked >= limit:
+                cutoff = score
+                break
+        above = [entry_id for entry_id, score in scores.items() if score > cutoff]
+        ties = [entry_id for entry_id, score in scores.items() if score == cutoff]
+        # Both sorts key on precomputed ranks, ties can be most of the index
+        above.sort(key=lambda entry_id: (-scores[entry_id], self._title_ranks[entry_id]))
+        ties.sort(key=self._title_ranks.__getitem__)
+        best = (above + ties)[:limit]
+        return [
+            SearchResult(*self._entries[entry_id], score=scores[entry_id] / len(tokens))
+            for entry_id in best
+        ]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _normalized_sql(column):
+    """SQL side of ``normalize`` for the trigram indexes, minus separator handling."""
+    # Constants rather than bind parameters, so generic plans still match the index
+    return func.translate(func.lower(column), literal_column("'ё'"), literal_column("'е'"))
+
+
+class PgTrigramSearch:
+    """
+    Search through ``pg_trgm`` instead of the in-process index.
+
+    Uses ``word_similarity`` against the expression indexes created by the
+    ``pg_trgm search`` migration, which are only there if the extension is
+    available. Meant for deployments where the in-process index would be
+    too large to keep in every worker.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        min_score: float = 0.3,
+    ):
+        self.session_factory = session_factory
+        self.min_score = min_score
+
+    async def search(self, query: str, limit: int = 10) -> list[SearchResult]:
+        normalized = normalize(query)
+        if not normalized:
+            return []
+
+        group_name = _normalized_sql(Group.name)
+        speciality_name = _normalized_sql(Speciality.clean_name)
+        teacher = _normalized_sql(Lesson.teacher)
+        groups = (
+            select(
+                literal(SearchKind.GROUP.value).label("kind"),
+                Group.id.label("id"),
+                (Group.name + " · " + Speciality.clean_name).label("title"),
+                func.word_similarity(normalized, group_name).label("score"),
+            )
+            .join(Speciality, Speciality.id == Group.speciality_id)
+            .where(literal(normalized).op("<%")(group_name))
+        )
+        specialities = select(
+            literal(SearchKind.SPECIALITY.value),
+            Speciality.id,
+            Speciality.full_name,
+            func.greatest(
+                func.word_similarity(normalized, speciality_name),
+                func.word_similarity(normalized, Speciality.code),
+            ),
+        ).where(
+            literal(normalized).op("<%")(speciality_name)
+            | Speciality.code.startswith(query.strip())
+        )
+        teachers = (
+            select(
+                literal(SearchKind.TEACHER.value),
+                literal(None, Integer),
+                Lesson.teacher,
+                func.word_similarity(normalized, teacher),
+            )
+            .where(literal(normalized).op("<%")(teacher))
+            .distinct()
+        )
+        matches = union_all(groups, specialities, teachers).subquery()
+        statement = (
+            select(matches)
+            .where(matches.c.score >= self.min_score)
+            .order_by(matches.c.score.desc(), func.length(matches.c.title))
+            .limit(limit)
+        )
+
+        async with self.session_factory() as session:
+            rows = await session.execute(statement)
+            return [
+                SearchResult(SearchKind(kind), row_id, title, float(score))
+                for kind, row_id, title, score in rows
+            ]
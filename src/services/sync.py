@@ -0,0 +1,449 @@
+import asyncio
+import datetime
+import hashlib
+import inspect
+import json
+import logging
+import re
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.client import ScheduleAPIClient
+from api.schemas.responses import ScheduleLesson, XlsxScheduleDetail, XlsxScheduleSummary
+from core.config import SyncSettings
+from models.enums import EducationLevel, LessonType
+from models.lesson import Lesson
+from models.speciality import Speciality
+from models.student_group import Group, Subgroup
+from models.sync_state import ScheduleSyncState
+from services.lesson_converter import LessonConverter, parse_pair_time
+from services.lesson_writer import LessonBulkWriter, LessonRecord, LessonScope
+from services.schedule_diff import SubgroupChanges
+
+logger = logging.getLogger(__name__)
+
+# Called with changes keyed by subgroup, iterating it gives the subgroup ids
+ChangeListener = Callable[[Mapping[int, SubgroupChanges]], Awaitable[None] | None]
+
+SPECIALITY_CODE_RE = re.compile(r"^\s*(\d{2}\.\d{2}\.\d{2})\s*(.*)$")
+
+EDUCATION_LEVELS = {
+    "03": EducationLevel.BACHELOR,
+    "04": EducationLevel.MASTER,
+    "05": EducationLevel.SPECIALIST,
+    "08": EducationLevel.RESIDENCY,
+}
+
+
+def dump_scopes(scopes: Iterable[LessonScope]) -> list[list]:
+    return [
+        [
+            scope.subgroup_id,
+            scope.lesson_type.name,
+            scope.date_from.isoformat(),
+            scope.date_to.isoformat(),
+        ]
+        for scope in scopes
+    ]
+
+
+def load_scopes(data: Iterable[list] | None) -> set[LessonScope]:
+    return {
+        LessonScope(
+            subgroup_id,
+            LessonType[lesson_type],
+            datetime.date.fromisoformat(date_from),
+            datetime.date.fromisoformat(date_to),
+        )
+        for subgroup_id, lesson_type, date_from, date_to in data or ()
+    }
+
+
+def summary_hash(summary: XlsxScheduleSummary) -> str:
+    """Fingerprint of a catalogue entry, cheap to compare without downloading."""
+    payload = summary.model_dump_json(by_alias=True).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+def content_hash(detail: XlsxScheduleDetail) -> str:
+    """Fingerprint of schedule lessons, independent of lesson ids and order."""
+    lessons = sorted(
+        json.dumps(
+            lesson.model_dump(mode="json", exclude={"id", "schedule_id", "error_list"}),
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        for lesson in detail.schedule_lesson_dto_list
+    )
+    return hashlib.sha256("\n".join(lessons).encode()).hexdigest()
+
+
+@dataclass(slots=True)
+class SyncReport:
+    """Outcome of a sync run."""
+
+    checked: int = 0
+    skipped: int = 0
+    downloaded: int = 0
+    unchanged: int = 0
+    updated: int = 0
+    failed: int = 0
+    removed: int = 0
+    lessons_written: int = 0
+    changes: dict[int, SubgroupChanges] = field(default_factory=dict)
+
+    @property
+    def changed_subgroups(self) -> set[int]:
+        return set(self.changes)
+
+
+class ScheduleSync:
+    """
+    Incremental sync of upstream schedules into the database.
+
+    A schedule is downloaded only if its catalogue entry changed or it was
+    last checked more than ``recheck_after_seconds`` ago, and its lessons
+    are rewritten only if ``update_time`` or the content hash changed.
+    Per-schedule watermarks are kept in ``schedule_sync_state``, along with
+    the lesson scopes each schedule wrote, so that lessons of a schedule
+    dropped from the catalogue are deleted unless another schedule still
+    writes the same scope; the same goes for scopes a rewritten schedule no
+    longer covers. The catalogue must be fetched completely for a run to
+    remove anything. Rewrites are diffed per lesson, so listeners hear only
+    about subgroups whose lessons actually changed, together with the
+    changes.
+    """
+
+    def __init__(
+        self,
+        client: ScheduleAPIClient,
+        session_factory: async_sessionmaker[AsyncSession],
+        settings: SyncSettings,
+    ):
+        self.client = client
+        self.session_factory = session_factory
+        self.settings = settings
+        self.converter = LessonConverter(settings)
+        self.writer = LessonBulkWriter(batch_size=settings.write_batch_size)
+        self._listeners: list[ChangeListener] = []
+        self._specialities: dict[str, int] = {}
+        self._groups: dict[tuple[int, int, str | None, str], int] = {}
+        self._subgroups: dict[tuple[int, str], int] = {}
+
+    def add_listener(self, listener: ChangeListener) -> None:
+        """Call ``listener`` with changes of subgroups whose lessons changed after each run."""
+        self._listeners.append(listener)
+
+    async def _notify_listeners(self, changes: Mapping[int, SubgroupChanges]) -> None:
+        for listener in self._listeners:
+            try:
+                result = listener(changes)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Sync listener %r failed", listener)
+
+    def _reset_structure_cache(self) -> None:
+        self._specialities.clear()
+        self._groups.clear()
+        self._subgroups.clear()
+
+    async def run(self) -> SyncReport:
+        """Run a single sync cycle."""
+        report = SyncReport()
+        # Rows may have been removed since the previous run
+        self._reset_structure_cache()
+        now = datetime.datetime.now(datetime.UTC)
+        recheck_after = datetime.timedelta(seconds=self.settings.recheck_after_seconds)
+
+        # Strict, since schedules missing from the list get their lessons deleted
+        summaries = await self.client.get_all_schedules(use_cache=False, strict=True)
+        report.checked = len(summaries)
+
+        async with self.session_factory() as session:
+            states = {
+                state.schedule_id: state
+                for state in await session.scalars(select(ScheduleSyncState))
+            }
+
+        hashes: dict[int, str] = {}
+        for summary in summaries:
+            hashes[summary.id] = summary_hash(summary)
+            state = states.get(summary.id)
+            if (
+                state is not None
+                and state.summary_hash == hashes[summary.id]
+                and now - state.checked_at < recheck_after
+            ):
+                report.skipped += 1
+                del hashes[summary.id]
+
+        logger.info(
+            "Sync: %d schedules in catalogue, %d to download",
+            report.checked,
+            len(hashes),
+        )
+
+        async for result in self.client.iter_schedule_details(
+            list(hashes),
+            concurrency=self.settings.concurrency,
+            use_cache=False,
+        ):
+            if not result.ok:
+                report.failed += 1
+                continue
+            if result.detail is None:
+                continue
+
+            report.downloaded += 1
+            try:
+                await self._sync_schedule(result.detail, hashes[result.schedule_id], now, report)
+            except Exception:
+                logger.exception("Failed to sync schedule %d", result.schedule_id)
+                report.failed += 1
+                # Cached ids may refer to rows rolled back with the transaction
+                self._reset_structure_cache()
+
+        removed = states.keys() - {summary.id for summary in summaries}
+        if removed and not summaries:
+            logger.warning("Empty schedule catalogue, keeping %d known schedules", len(removed))
+        elif removed:
+            try:
+                changes = await self._remove_schedules(removed)
+            except Exception:
+                logger.exception("Failed to remove %d schedules", len(removed))
+            else:
+                report.removed = len(removed)
+                for subgroup_id, subgroup_changes in changes.items():
+                    report.changes.setdefault(subgroup_id, SubgroupChanges()).merge(
+                        subgroup_changes
+                    )
+
+        logger.info(
+            "Sync finished: %d updated, %d unchanged, %d skipped, %d failed, %d lessons written",
+            report.updated,
+            report.unchanged,
+            report.skipped,
+            report.failed,
+            report.lessons_written,
+        )
+        if report.changes:
+            await self._notify_listeners(report.changes)
+        return report
+
+    async def run_forever(self) -> None:
+        """Run sync cycles every ``interval_seconds`` until cancelled."""
+        while True:
+            try:
+                await self.run()
+            except Exception:
+                logger.exception("Sync run failed")
+            await asyncio.sleep(self.settings.interval_seconds)
+
+    async def _remove_schedules(self, schedule_ids: set[int]) -> dict[int, SubgroupChanges]:
+        """Forget removed schedules and delete lessons no remaining schedule writes."""
+        changes: dict[int, SubgroupChanges] = {}
+        async with self.session_factory() as session, session.begin():
+            orphaned: set[LessonScope] = set()
+            for scopes in await session.scalars(
+                select(ScheduleSyncState.scopes).where(
+                    ScheduleSyncState.schedule_id.in_(schedule_ids)
+                )
+            ):
+                orphaned.update(load_scopes(scopes))
+            kept = await self._scopes_written(session, excluding=schedule_ids)
+
+            for scope in orphaned - kept:
+                deleted = await session.execute(
+                    delete(Lesson)
+                    .where(
+                        Lesson.subgroup_id == scope.subgroup_id,
+                        Lesson.lesson_type == scope.lesson_type,
+                        Lesson.date.between(scope.date_from, scope.date_to),
+                        or_(Lesson.schedule_id.is_(None), Lesson.schedule_id.in_(schedule_ids)),
+                    )
+                    .returning(*(getattr(Lesson, name) for name in LessonRecord._fields))
+                )
+                for row in deleted:
+                    changes.setdefault(scope.subgroup_id, SubgroupChanges()).removed.append(
+                        LessonRecord(*row)
+                    )
+
+            await session.execute(
+                delete(ScheduleSyncState).where(ScheduleSyncState.schedule_id.in_(schedule_ids))
+            )
+        logger.info(
+            "Removed %d schedules and %d of their lessons",
+            len(schedule_ids),
+            sum(len(subgroup_changes) for subgroup_changes in changes.values()),
+        )
+        return changes
+
+    @staticmethod
+    async def _scopes_written(session: AsyncSession, excluding: set[int]) -> set[LessonScope]:
+        """Scopes written by schedules other than ``excluding``."""
+        scopes: set[LessonScope] = set()
+        for data in await session.scalars(
+            select(ScheduleSyncState.scopes).where(ScheduleSyncState.schedule_id.not_in(excluding))
+        ):
+            scopes.update(load_scopes(data))
+        return scopes
+
+    async def _sync_schedule(
+        self,
+        detail: XlsxScheduleDetail,
+        schedule_summary_hash: str,
+        now: datetime.datetime,
+        report: SyncReport,
+    ) -> None:
+        """Compare schedule with its watermark and rewrite lessons if changed."""
+        async with self.session_factory() as session, session.begin():
+            state = await session.get(ScheduleSyncState, detail.id)
+            if state is None:
+                state = ScheduleSyncState(schedule_id=detail.id)
+                session.add(state)
+
+            state.summary_hash = schedule_summary_hash
+            state.checked_at = now
+
+            if state.update_time is not None and state.update_time == detail.update_time:
+                report.unchanged += 1
+                return
+
+            new_hash = content_hash(detail)
+            if state.content_hash == new_hash:
+                state.update_time = detail.update_time
+                report.unchanged += 1
+                return
+
+            written, changes, scopes = await self._write_lessons(
+                session, detail, load_scopes(state.scopes)
+            )
+
+            state.scopes = dump_scopes(scopes)
+            state.content_hash = new_hash
+            state.update_time = detail.update_time
+            state.synced_at = now
+
+            report.updated += 1
+            report.lessons_written += written
+            for subgroup_id, subgroup_changes in changes.items():
+                report.changes.setdefault(subgroup_id, SubgroupChanges()).merge(subgroup_changes)
+            logger.info(
+                "Schedule %d updated: %d lessons, %d changed",
+                detail.id,
+                written,
+                sum(len(subgroup_changes) for subgroup_changes in changes.values()),
+            )
+
+    async def _write_lessons(
+        self,
+        session: AsyncSession,
+        detail: XlsxScheduleDetail,
+        previous_scopes: set[LessonScope],
+    ) -> tuple[int, dict[int, SubgroupChanges], list[LessonScope]]:
+        """
+        Replace lessons of the schedule's subgroups within its semester.
+
+        Scopes of ``previous_scopes`` the schedule no longer covers, e.g.
+        of a subgroup dropped from it, are replaced with nothing unless
+        another schedule writes them too.
+        """
+        lessons: list[tuple[int, ScheduleLesson]] = []
+        scopes: dict[tuple[int, LessonType], LessonScope] = {}
+
+        for lesson in detail.schedule_lesson_dto_list:
+            if (
+                self.converter.semester_bounds(lesson.academic_year, lesson.semester) is None
+                or parse_pair_time(lesson.pair_time) is None
+            ):
+                logger.warning("Schedule %d: skipping unparsable lesson %d", detail.id, lesson.id)
+                continue
+
+            subgroup_id = await self._subgroup_id(session, lesson)
+            scope = self.converter.scope(subgroup_id, lesson)
+            scopes.setdefault((scope.subgroup_id, scope.lesson_type), scope)
+            lessons.append((subgroup_id, lesson))
+
+        dropped = previous_scopes - set(scopes.values())
+        if dropped:
+            dropped -= await self._scopes_written(session, excluding={detail.id})
+        if not scopes and not dropped:
+            return 0, {}, []
+
+        write_report = await self.writer.write(
+            session,
+            self.converter.convert(lessons),
+            [*scopes.values(), *dropped],
+            diff=True,
+            schedule_id=detail.id,
+        )
+        return write_report.rows_copied, write_report.changes, list(scopes.values())
+
+    async def _subgroup_id(self, session: AsyncSession, lesson: ScheduleLesson) -> int:
+        """Get or create speciality, group and subgroup of the lesson."""
+        speciality_id = self._specialities.get(lesson.speciality)
+        if speciality_id is None:
+            speciality_id = await self._get_or_create_speciality(session, lesson.speciality)
+            self._specialities[lesson.speciality] = speciality_id
+
+        course_number = int(re.sub(r"\D", "", lesson.course_number) or 0)
+        stream = lesson.group_stream.strip() or None
+        group_key = (speciality_id, course_number, stream, lesson.study_group)
+        group_id = self._groups.get(group_key)
+        if group_id is None:
+            group_id = await self._get_or_create(
+                session,
+                Group,
+                speciality_id=speciality_id,
+                course_number=course_number,
+                stream=stream,
+                name=lesson.study_group,
+            )
+            self._groups[group_key] = group_id
+
+        subgroup_key = (group_id, lesson.subgroup)
+        subgroup_id = self._subgroups.get(subgroup_key)
+        if subgroup_id is None:
+            subgroup_id = await self._get_or_create(
+                session, Subgroup, group_id=group_id, name=lesson.subgroup
+            )
+            self._subgroups[subgroup_key] = subgroup_id
+        return subgroup_id
+
+    async def _get_or_create_speciality(self, session: AsyncSession, full_name: str) -> int:
+        match = SPECIALITY_CODE_RE.match(full_name)
+        code, clean_name = (match.group(1), match.group(2)) if match else ("", full_name)
+        level = EDUCATION_LEVELS.get(code[3:5]) if code else None
+        return await self._get_or_create(
+            session,
+            Speciality,
+            lookup={"full_name": full_name},
+            code=code,
+            clean_name=clean_name.strip() or full_name,
+            level=level,
+        )
+
+    @staticmethod
+    async def _get_or_create(
+        session: AsyncSession,
+        model: type[Speciality] | type[Group] | type[Subgroup],
+        lookup: dict | None = None,
+        **values,
+    ) -> int:
+        """Return id of row matching ``lookup`` (or ``values``), inserting it if missing."""
+        lookup = lookup or values
+        conditions = [
+            getattr(model, name).is_(None) if value is None else getattr(model, name) == value
+            for name, value in lookup.items()
+        ]
+        row_id = await session.scalar(select(model.id).where(*conditions))
+        if row_id is None:
+            row = model(**lookup, **{k: v for k, v in values.items() if k not in lookup})
+            session.add(row)
+            await session.flush()
+            row_id = row.id
+        return row_id